@@ -0,0 +1,3 @@
+"""
+Microbenchmarks for the Cognito NLP and outline hot paths
+"""
@@ -0,0 +1,74 @@
+import os
+import random
+from typing import List
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+_SUBJECTS = ["The writer", "Our team", "My editor", "The reader", "A student", "Sarah", "The committee", "Everyone"]
+_VERBS = ["revised", "discussed", "questioned", "outlined", "explains", "describes", "will publish", "has drafted"]
+_OBJECTS = ["the argument", "a new chapter", "the final report", "several ideas", "the introduction",
+            "a short essay", "the research notes", "an early draft"]
+_TAILS = ["before the deadline", "because the structure was unclear", "while the coffee went cold",
+          "in London last winter", "although nobody asked", "with surprising care", "after the meeting", ""]
+_TRANSITIONS = ["However, ", "Therefore, ", "Meanwhile, ", "Moreover, ", "", "", "", ""]
+_ENDINGS = [".", ".", ".", "!", "?"]
+
+
+def synthetic_text(size: int, seed: int = 0) -> str:
+    """
+    Deterministic synthetic prose of roughly `size` characters.
+    
+    Args:
+        size (int): Target length in characters
+        seed (int): Random seed, so runs are reproducible
+        
+    Returns:
+        str: Generated text made of paragraphs of simple sentences
+    """
+    rng = random.Random(seed)
+    paragraphs = []
+    length = 0
+    while length < size:
+        sentences = []
+        for _ in range(rng.randint(3, 7)):
+            transition, subject, tail = rng.choice(_TRANSITIONS), rng.choice(_SUBJECTS), rng.choice(_TAILS)
+            if transition and subject != "Sarah":
+                subject = subject[0].lower() + subject[1:]
+            sentence = f"{transition}{subject} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}"
+            if tail:
+                sentence += f" {tail}"
+            sentences.append(sentence + rng.choice(_ENDINGS))
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:size]
+
+def bundled_text(size: int) -> str:
+    """
+    The bundled essay corpus, repeated or truncated to `size` characters.
+    
+    Args:
+        size (int): Target length in characters
+        
+    Returns:
+        str: Text of exactly `size` characters (cut at the end)
+    """
+    with open(os.path.join(DATA_DIR, "essays.txt"), "r", encoding="utf-8") as f:
+        base = f.read().strip()
+    repeats = size // (len(base) + 2) + 1
+    return "\n\n".join([base] * repeats)[:size]
+
+def make_text(corpus: str, size: int, seed: int = 0) -> str:
+    """Text of `size` characters from the named corpus ('synthetic' or 'bundled')"""
+    if corpus == "synthetic":
+        return synthetic_text(size, seed=seed)
+    if corpus == "bundled":
+        return bundled_text(size)
+    raise ValueError(f"Unknown corpus: {corpus}")
+
+def make_documents(corpus: str, count: int, size: int) -> List[str]:
+    """`count` documents of `size` characters each; synthetic documents differ per seed"""
+    if corpus == "synthetic":
+        return [synthetic_text(size, seed=i) for i in range(count)]
+    text = make_text(corpus, size)
+    return [text] * count
@@ -0,0 +1,226 @@
+"""
+Run the NLP and outline microbenchmarks and report machine-readable results.
+
+Usage (from the backend directory):
+    python -m benchmarks.run --quick
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --baseline bench.json --threshold 1.25
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .corpus import make_documents, make_text
+
+SIZES = {"1kb": 1_000, "10kb": 10_000, "100kb": 100_000, "1mb": 1_000_000}
+DOC_COUNTS = [1, 10, 100, 1000]
+CORPORA = ["synthetic", "bundled"]
+BATCH_DOC_SIZE = 1_000
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(fn: Callable[[], Any], repeats: int, docs: int = 1) -> Dict[str, Any]:
+    """
+    Time `fn` over several calls, then run it once more under tracemalloc for peak memory.
+    
+    Args:
+        fn (callable): Zero-argument call to benchmark
+        repeats (int): Number of timed calls
+        docs (int): Documents processed per call, used for docs/sec
+        
+    Returns:
+        Dict with latency statistics (ms), throughput and peak traced memory
+    """
+    fn()  # warm-up, excluded from the results
+
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean = statistics.mean(latencies)
+    return {
+        "calls": repeats,
+        "latency_ms": {
+            "mean": round(mean, 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "min": round(min(latencies), 3),
+            "max": round(max(latencies), 3),
+        },
+        "docs_per_sec": round(docs / (mean / 1000), 2) if mean > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+def _repeats_for(size: int, repeat: int) -> int:
+    # Keep the large inputs affordable: fewer timed calls as documents grow
+    return max(1, min(repeat, 200_000 // max(size, 1)))
+
+def _use_fake_llm(latency: float) -> None:
+    from src import registry
+    from src.models.fake_openai import FakeChatClient
+    from src.models.llm_cache import CachedChatClient
+    # Cache disabled so every run pays the simulated round trips
+    registry.override("llm_client", CachedChatClient(FakeChatClient(latency=latency), enabled=False))
+
+def run_benchmarks(sizes: List[str], doc_counts: List[int], corpora: List[str], repeat: int,
+                   llm_latency: float, only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Run every selected benchmark case and return one result dict per case"""
+    from src import registry
+    from src.nlp_processing.analysis import TextAnalysis
+    from src.nlp_processing.preprocess import preprocess_text, analyze_writing_style, batch_process_texts
+    from src.models.outline_generator import analyze_text_structure, extract_key_topics, generate_outline
+
+    registry.warm_up(["nlp"])
+    _use_fake_llm(llm_latency)
+
+    def selected(name: str) -> bool:
+        return not only or name in only
+
+    results = []
+
+    def record(name: str, params: Dict[str, Any], fn: Callable[[], Any], repeats: int, docs: int = 1) -> None:
+        print(f"running {name} {params}", file=sys.stderr)
+        results.append({"benchmark": name, "params": params, **measure(fn, repeats, docs)})
+
+    for corpus in corpora:
+        for size_name in sizes:
+            size = SIZES[size_name]
+            text = make_text(corpus, size)
+            params = {"corpus": corpus, "size": size_name, "chars": len(text)}
+            repeats = _repeats_for(size, repeat)
+
+            if selected("preprocess_text"):
+                record("preprocess_text", params, lambda: preprocess_text(text), repeats)
+            if selected("analyze_writing_style"):
+                record("analyze_writing_style", params, lambda: analyze_writing_style(text), repeats)
+            if selected("analyze_text_structure"):
+                record("analyze_text_structure", params, lambda: analyze_text_structure(text), repeats)
+            if selected("extract_key_topics"):
+                record("extract_key_topics", params, lambda: extract_key_topics(text, {}), repeats)
+
+            if selected("generate_outline") and size <= SIZES["10kb"]:
+                # Parsing is benchmarked above; this measures topic extraction plus the LLM fan-out
+                analysis = TextAnalysis(text)
+                text_analysis = preprocess_text(text, analysis)
+                style_analysis = analyze_writing_style(text, analysis)
+                record(
+                    "generate_outline", {**params, "llm_latency_s": llm_latency},
+                    lambda: generate_outline(text, text_analysis, style_analysis, [], analysis=analysis),
+                    repeats
+                )
+
+        if selected("batch_process_texts"):
+            for count in doc_counts:
+                docs = make_documents(corpus, count, BATCH_DOC_SIZE)
+                params = {"corpus": corpus, "docs": count, "doc_chars": BATCH_DOC_SIZE}
+                record("batch_process_texts", params, lambda: batch_process_texts(docs, max_texts=count),
+                       _repeats_for(count * BATCH_DOC_SIZE, repeat), docs=count)
+
+    return results
+
+def environment() -> Dict[str, Any]:
+    """Details needed to compare results across machines and commits"""
+    info = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+    try:
+        import spacy
+        info["spacy"] = spacy.__version__
+    except ImportError:
+        pass
+    try:
+        info["git_commit"] = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Find cases whose mean latency regressed beyond `threshold` times the baseline.
+    
+    Returns:
+        List of regressions with the baseline and current mean latency
+    """
+    def key(result: Dict[str, Any]) -> str:
+        return json.dumps([result["benchmark"], result["params"]], sort_keys=True)
+
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        ratio = result["latency_ms"]["mean"] / before["latency_ms"]["mean"] if before["latency_ms"]["mean"] else 1.0
+        if ratio > threshold:
+            regressions.append({
+                "benchmark": result["benchmark"],
+                "params": result["params"],
+                "baseline_ms": before["latency_ms"]["mean"],
+                "current_ms": result["latency_ms"]["mean"],
+                "ratio": round(ratio, 3),
+            })
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Only the 1kb/10kb sizes and 1/10 documents")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--doc-counts", nargs="+", type=int, default=DOC_COUNTS)
+    parser.add_argument("--corpora", nargs="+", choices=CORPORA, default=CORPORA)
+    parser.add_argument("--only", nargs="+", help="Benchmark names to run, defaults to all")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per case (fewer for large inputs)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Simulated seconds per fake OpenAI call")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.sizes = [size for size in args.sizes if SIZES[size] <= SIZES["10kb"]]
+        args.doc_counts = [count for count in args.doc_counts if count <= 10]
+
+    results = run_benchmarks(args.sizes, args.doc_counts, args.corpora, args.repeat, args.llm_latency, args.only)
+    report = {"environment": environment(), "results": results}
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(results, baseline["results"], args.threshold)
+        exit_code = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
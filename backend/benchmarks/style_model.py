@@ -0,0 +1,87 @@
+"""
+Throughput of the writing style classifier across inference backends.
+
+Compares the previous path (one transformers pipeline call per text, truncated
+to the model's maximum length) with the batched, windowed StyleClassifier on
+each backend, and reports how often each backend agrees with the eager
+PyTorch labels.
+
+Usage (from the backend directory):
+    python -m benchmarks.style_model --backends pytorch int8
+    python -m benchmarks.style_model --docs 64 --doc-chars 4000 --output style.json
+"""
+import argparse
+import importlib.util
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+from .corpus import make_documents
+from .run import CORPORA, environment, measure
+
+BACKENDS = ["pytorch", "int8", "onnx"]
+
+
+def run_benchmarks(model_name: str, backends: List[str], corpus: str, docs: int, doc_chars: int,
+                   batch_size: int, repeat: int) -> List[Dict[str, Any]]:
+    """Benchmark the per-text pipeline and each backend, returning one result dict per case"""
+    from transformers import pipeline
+    from src.models.writer_style_model import StyleClassifier
+
+    texts = make_documents(corpus, docs, doc_chars)
+    params = {"model": model_name, "corpus": corpus, "docs": docs, "doc_chars": doc_chars}
+    results = []
+
+    print("running pipeline_per_text", file=sys.stderr)
+    classifier = pipeline("text-classification", model=model_name)
+    reference = [classifier(text, truncation=True)[0]["label"] for text in texts]
+    baseline = measure(lambda: [classifier(text, truncation=True) for text in texts], repeat, docs)
+    results.append({"benchmark": "style_classifier", "params": {**params, "mode": "pipeline_per_text"}, **baseline})
+    del classifier
+
+    for backend in backends:
+        if backend == "onnx" and importlib.util.find_spec("optimum") is None:
+            print("skipping onnx: optimum[onnxruntime] is not installed", file=sys.stderr)
+            continue
+        print(f"running {backend}", file=sys.stderr)
+        classifier = StyleClassifier.load(model_name, backend, batch_size=batch_size)
+        if classifier.backend != backend:
+            continue
+        labels = [prediction["label"] for prediction in classifier.classify(texts)]
+        result = measure(lambda: classifier.classify(texts), repeat, docs)
+        result["speedup"] = round(baseline["latency_ms"]["mean"] / result["latency_ms"]["mean"], 2)
+        # Windowing changes long-text labels too, so this is only a sanity check for quantisation
+        result["label_agreement"] = round(sum(a == b for a, b in zip(labels, reference)) / len(texts), 3)
+        results.append({
+            "benchmark": "style_classifier",
+            "params": {**params, "mode": "batched", "backend": backend, "batch_size": batch_size},
+            **result
+        })
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.settings import STYLE_MODEL
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=STYLE_MODEL, help="Hugging Face model name or local path")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--corpus", choices=CORPORA, default="synthetic")
+    parser.add_argument("--docs", type=int, default=32)
+    parser.add_argument("--doc-chars", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=16, help="Windows per forward pass")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per case")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.model, args.backends, args.corpus, args.docs, args.doc_chars,
+                             args.batch_size, args.repeat)
+    output = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Micro-batching of concurrent requests.
+
+Concurrent callers of the same batched function are coalesced: their inputs
+are collected until the batch is full or the oldest has waited `max_wait_ms`,
+then run as one call on the worker pool (one `nlp.pipe` or one classifier
+forward pass), and each caller gets back its own result.
+"""
+import asyncio
+from typing import Any, Callable, List, Optional, Set, Tuple
+from .executor import WorkerPool, worker_pool
+from ..settings import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+
+
+class MicroBatcher:
+    """Coalesces concurrent `submit` calls into batched calls of `batch_fn`; use from the event loop"""
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: float = BATCH_MAX_WAIT_MS, pool: Optional[WorkerPool] = None):
+        """
+        Args:
+            batch_fn (Callable): Picklable, module-level function mapping a list of
+                inputs to a list of results in the same order
+            max_batch_size (int): Largest number of inputs per call of `batch_fn`
+            max_wait_ms (float): Longest time the first input of a batch waits for others
+            pool (WorkerPool, optional): Pool to run batches on, defaults to the shared pool
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.pool = pool or worker_pool
+        self.batches = 0
+        self.items = 0
+        self._queue: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The event loop only keeps weak references to tasks, so running batches are held here
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one input and wait for its result.
+        
+        Args:
+            item: Picklable input for `batch_fn`
+            
+        Returns:
+            The result of `batch_fn` for `item`
+        
+        Raises:
+            HTTPException: When the pool rejects or times out the batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((item, future))
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            batch = self._queue[:self.max_batch_size]
+            self._queue = self._queue[self.max_batch_size:]
+            # Drop callers that gave up (e.g. disconnected) before the batch ran
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if batch:
+                task = asyncio.ensure_future(self._run(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error running batch of {self.batch_fn.__name__}: {task.exception()!r}")
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.pool.run(self.batch_fn, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """Batch configuration and counters"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "running": len(self._tasks),
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0
+        }
@@ -1,25 +1,74 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from backend.src.nlp_processing.preprocess import preprocess_text
-from backend.src.models.writer_block_detector import detect_writer_block
-from backend.src.models.writer_style_model import analyze_writing_style
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from backend.src.nlp_processing.partial import parse_fields
+from backend.src.nlp_processing.preprocess import preprocess_requests
+from backend.src.models.writer_block_detector import WriterBlockDetector
+from backend.src.models.writer_style_model import analyze_writing_styles
+from backend.src.api.executor import worker_pool
+from backend.src.api.batching import MicroBatcher
 
 router = APIRouter()
 
+# Concurrent requests are coalesced into one nlp.pipe / classifier call on the worker pool
+preprocess_batcher = MicroBatcher(preprocess_requests)
+style_batcher = MicroBatcher(analyze_writing_styles)
+
+# Per-session typing statistics; updates are O(1) so they run on the event loop
+writer_block_detector = WriterBlockDetector()
+
 class TextRequest(BaseModel):
     text: str
 
+class PreprocessRequest(TextRequest):
+    # Subset of preprocess_text's keys to compute and return, all by default
+    fields: Optional[List[str]] = None
+
 @router.post("/preprocess/")
-async def preprocess_text_api(data: TextRequest):
-    cleaned_text = preprocess_text(data.text)
+async def preprocess_text_api(data: PreprocessRequest):
+    try:
+        fields = parse_fields(data.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    cleaned_text = await preprocess_batcher.submit((data.text, None if fields is None else tuple(sorted(fields))))
     return {"processed_text": cleaned_text}
 
+class WriterBlockRequest(BaseModel):
+    # Detection needs a session's editor events; requests without one get "unknown_session"
+    session_id: Optional[str] = None
+    text: str = ""
+
+class EditorEvent(BaseModel):
+    # Client time in seconds; only the spacing between events of one batch is used
+    timestamp: Optional[float] = None
+    chars: int = Field(1, ge=0)
+
+class EditorEventsRequest(BaseModel):
+    session_id: str
+    events: List[EditorEvent]
+
+@router.post("/writer-block/events/")
+async def record_editor_events(data: EditorEventsRequest):
+    writer_block_detector.record_events(data.session_id, (event.model_dump() for event in data.events))
+    return writer_block_detector.detect(data.session_id)
+
 @router.post("/detect-writer-block/")
-async def detect_block(data: TextRequest):
-    block_status = detect_writer_block(data.text)
-    return {"writer_block_detected": block_status}
+async def detect_block(data: WriterBlockRequest):
+    if data.session_id is None:
+        return {"writer_block_detected": False, "reason": "unknown_session"}
+    return writer_block_detector.detect(data.session_id)
 
 @router.post("/analyze-style/")
 async def analyze_style(data: TextRequest):
-    style = analyze_writing_style(data.text)
+    style = await style_batcher.submit(data.text)
     return {"writing_style": style}
+
+@router.get("/pool/")
+async def pool_stats():
+    return {
+        **worker_pool.stats(),
+        "batching": {
+            "preprocess": preprocess_batcher.stats(),
+            "analyze_style": style_batcher.stats()
+        }
+    }
@@ -0,0 +1,123 @@
+"""
+Process-pool executor for the CPU-bound work behind the FastAPI routes.
+
+Worker processes load the shared models once, in their initializer, and the
+event loop only awaits results, so a long document never blocks other
+requests. The number of requests queued or running on the pool is bounded:
+once it is full new requests fail fast with 429 instead of piling up, and
+each request is bounded by a timeout (504).
+"""
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional
+from fastapi import HTTPException
+from .. import registry
+from ..settings import API_WORKERS, API_MAX_PENDING, API_TIMEOUT, API_PRELOAD
+
+
+def _init_worker(preload: List[str]) -> None:
+    # Load models before the first task so no request pays for it
+    registry.warm_up(preload)
+
+
+class WorkerPool:
+    """Bounded process pool; `run` must be awaited from the event loop"""
+
+    def __init__(self, max_workers: int = API_WORKERS, max_pending: int = API_MAX_PENDING,
+                 timeout: float = API_TIMEOUT, preload: Optional[List[str]] = None):
+        """
+        Args:
+            max_workers (int): Number of worker processes
+            max_pending (int): Requests queued or running before new ones are rejected
+            timeout (float): Default seconds to wait for a result
+            preload (List[str], optional): Registry entries each worker loads at startup
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.preload = API_PRELOAD if preload is None else preload
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        """Start the worker processes and have each one load the preloaded models"""
+        if self._pool is not None:
+            return
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self.preload,)
+        )
+        # Spawn every worker now rather than on the first requests
+        for _ in range(self.max_workers):
+            self._pool.submit(int)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling queued work"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _release(self, _future: Future) -> None:
+        self.pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run `fn(*args)` on the pool and await its result.
+        
+        Args:
+            fn (Callable): Picklable, module-level function
+            *args: Picklable arguments for `fn`
+            timeout (float, optional): Seconds to wait, defaults to the pool's timeout
+            
+        Returns:
+            The return value of `fn`
+        
+        Raises:
+            HTTPException: 429 when the queue is full, 503 when the pool is unavailable,
+                504 when the result takes longer than `timeout`
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=429, detail="Server is busy, try again later",
+                                headers={"Retry-After": "1"})
+        if self._pool is None:
+            raise HTTPException(status_code=503, detail="Worker pool is not running")
+
+        try:
+            future = self._pool.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"Error submitting work to the pool: {str(e)}")
+            raise HTTPException(status_code=503, detail="Worker pool is unavailable")
+
+        # The slot is held until the work actually finishes, even after a timeout,
+        # so the bound reflects what the workers are really doing
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(self._release, f))
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future),
+                                          self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPException(status_code=504, detail="Processing timed out")
+        except BrokenProcessPool:
+            raise HTTPException(status_code=503, detail="Worker pool is unavailable")
+
+    def stats(self) -> dict:
+        """Pool configuration and load counters"""
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out
+        }
+
+
+# Shared pool, started and stopped by the application lifespan
+worker_pool = WorkerPool()
@@ -1,7 +1,16 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from backend.src.api.endpoints import router
+from backend.src.api.executor import worker_pool
 
-app = FastAPI(title="AI Writing Tool API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the workers (and load their models) before serving requests
+    worker_pool.start()
+    yield
+    worker_pool.shutdown()
+
+app = FastAPI(title="AI Writing Tool API", lifespan=lifespan)
 
 app.include_router(router)
 
@@ -1,12 +1,24 @@
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, g, request, jsonify, render_template_string, stream_with_context
 from flask_cors import CORS
+import json
 import os
+import time
 from werkzeug.utils import secure_filename
-import tempfile
 from dotenv import load_dotenv
-from src.nlp_processing.preprocess import preprocess_text, analyze_writing_style, batch_process_texts
-from src.models.outline_generator import generate_outline
-from src.database.dataset_loader import BlogDatasetLoader
+from src.nlp_processing.preprocess import preprocess_text, analyze_writing_style, iter_text_analyses
+from src.nlp_processing.analysis import TextAnalysis
+from src.nlp_processing.partial import parse_fields
+from src.database.result_store import STORED_FIELDS, analyzer_key, content_hash
+from src.nlp_processing.extraction import extract_texts, start_extraction_pools
+from src.models.style_index import style_features
+from src.nlp_processing.incremental import IncrementalAnalyzer
+from src.models.outline_generator import generate_outline, iter_outline
+from src.models.writer_block_detector import WriterBlockDetector
+from src.models.style_profile import StyleProfile
+from src import metrics
+from src.registry import (get_llm_client, get_result_store, get_style_examples, get_style_index, get_style_profiles,
+                          is_loaded, warm_up)
+from src.settings import WARMUP, UPLOAD_NLP_PROCESSES, UPLOAD_PIPELINE_PROFILE, SERVER_TIMING
 
 # Load environment variables
 load_dotenv()
@@ -24,7 +36,7 @@ CORS(app,
                  "http://127.0.0.1:5000"
              ],
              "methods": ["GET", "POST", "OPTIONS"],
-             "allow_headers": ["Content-Type", "Authorization", "Accept", "Origin"],
+             "allow_headers": ["Content-Type", "Authorization", "Accept", "Origin", "X-User-Id"],
              "expose_headers": ["Content-Type"],
              "supports_credentials": False,
              "max_age": 600
@@ -42,15 +54,43 @@ def after_request(response):
             response.headers.add('Access-Control-Allow-Origin', origin)
         else:
             response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization, Accept')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization, Accept, X-User-Id')
         response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
     return response
 
+@app.before_request
+def start_request_timing():
+    g.request_start = time.perf_counter()
+    g.metrics_token = metrics.start_request()
+
+def record_request(endpoint, method, status, start):
+    metrics.REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
+    metrics.REQUESTS.inc(endpoint=endpoint, method=method, status=str(status))
+
+@app.after_request
+def record_request_timing(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    if response.is_streamed:
+        # The body is generated after this hook returns, so the request is only
+        # complete once the server closes the response
+        start, method, status = g.request_start, request.method, response.status_code
+        response.call_on_close(lambda: record_request(endpoint, method, status, start))
+        return response
+    record_request(endpoint, request.method, response.status_code, g.request_start)
+    spans = metrics.request_spans()
+    if SERVER_TIMING and spans:
+        response.headers['Server-Timing'] = metrics.server_timing_header(spans)
+    return response
+
+@app.teardown_request
+def end_request_timing(exc):
+    token = g.pop('metrics_token', None)
+    if token is not None:
+        metrics.end_request(token)
+
 # Configure upload settings
-UPLOAD_FOLDER = tempfile.gettempdir()
 ALLOWED_EXTENSIONS = {'doc', 'docx', 'pdf', 'txt'}
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # HTML template for the root page
@@ -77,15 +117,59 @@ API_DOCS = """
     <div class="endpoint">
         <h2>Upload Files</h2>
         <p><code>POST /api/upload</code></p>
-        <p>Upload and analyze documents (supports .txt, .doc, .docx, .pdf)</p>
+        <p>Upload and analyze documents (supports .txt, .doc, .docx, .pdf). Requests limited to
+        <code>statistics</code> and <code>style_metrics</code> are served from the result store for files analysed
+        before (marked <code>"cached": true</code>); it keeps only those numbers, no document text or entities. With an <code>X-User-Id</code> header
+        (or <code>user_id</code> form value) the files are added to that user's style profile.</p>
+        <p>Optional <code>fields</code> form value: comma-separated subset of <code>preprocessed_text</code>,
+        <code>statistics</code>, <code>common_words</code>, <code>named_entities</code> and <code>style_metrics</code>.
+        Only those are computed and returned.</p>
+    </div>
+
+    <div class="endpoint">
+        <h2>Analyze Text</h2>
+        <p><code>POST /api/analyze</code></p>
+        <p>Analyze the current editor text, re-parsing only paragraphs that changed since earlier requests.
+        Accepts an optional <code>fields</code> list, as for uploads.</p>
     </div>
 
     <div class="endpoint">
         <h2>Generate Outline</h2>
         <p><code>POST /api/generate-outline</code></p>
-        <p>Generate an outline from provided text.</p>
+        <p>Generate an outline from provided text. Accepts an optional <code>fields</code> list selecting the returned statistics,
+        and an <code>X-User-Id</code> header (or <code>user_id</code>) to tailor it to that user's style profile.</p>
+    </div>
+
+    <div class="endpoint">
+        <h2>Stream Outline</h2>
+        <p><code>POST /api/generate-outline/stream</code></p>
+        <p>Generate an outline as newline-delimited JSON events: statistics first, then each section as it is ready,
+        and finally a <code>timing</code> event with the per-stage durations otherwise sent as <code>Server-Timing</code>.</p>
     </div>
     
+    <div class="endpoint">
+        <h2>Writer's Block Events</h2>
+        <p><code>POST /api/writer-block/events</code></p>
+        <p>Record editor keystroke/edit events for a session (<code>{"session_id": ..., "events": [{"timestamp": ..., "chars": ...}]}</code>,
+        timestamps in seconds, used only to space out the events of one batch)
+        and get its writer's block status.</p>
+        <p><code>GET /api/writer-block/&lt;session_id&gt;</code></p>
+        <p>Current writer's block status of a session.</p>
+    </div>
+
+    <div class="endpoint">
+        <h2>Style Profile</h2>
+        <p><code>GET /api/style-profile</code></p>
+        <p>Running style statistics of the user given by the <code>X-User-Id</code> header (or <code>user_id</code>
+        query value), aggregated over every document uploaded with that id. User ids are not authenticated.</p>
+    </div>
+
+    <div class="endpoint">
+        <h2>Metrics</h2>
+        <p><code>GET /api/metrics</code></p>
+        <p>Per-stage timing histograms and request counters in the Prometheus text format.</p>
+    </div>
+
     <div class="endpoint">
         <h2>Get API Key</h2>
         <p><code>GET /api/secret</code></p>
@@ -103,15 +187,124 @@ def index():
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# Initialize the dataset loader
-blog_dataset = BlogDatasetLoader()
-blog_dataset.load_dataset()
+# Models and datasets load lazily through the registry; warm up the configured
+# entries now. Style example analyses are only read from their versioned on-disk cache;
+# the corpus is never loaded by the server.
+# Extraction pools are started here, before any request thread exists. Their workers
+# re-import this module as __mp_main__ when it is run directly, and must not do either.
+if __name__ != '__mp_main__':
+    warm_up(WARMUP)
+    start_extraction_pools()
+
+# Paragraph-level cache shared by live editor sessions
+incremental_analyzer = IncrementalAnalyzer()
+
+# Rolling typing statistics of live editor sessions
+writer_block_detector = WriterBlockDetector()
+
+def stored_result(entry, analysis):
+    """Result store payload of an analysed upload: numbers only, never document text or entities"""
+    return {
+        "statistics": entry["statistics"]["statistics"],
+        "style_metrics": entry["style_metrics"],
+        # Sentence length histogram, so profiles of cached documents keep their exact variance
+        "sentence_lengths": dict(analysis.aggregates.sentence_lengths)
+    }
+
+def stored_profile(result):
+    """Single-document style profile from a result store payload"""
+    style = result["style_metrics"]
+    return StyleProfile.from_counts(
+        result["statistics"]["word_count"],
+        {int(length): count for length, count in result["sentence_lengths"].items()},
+        style["verb_tenses"],
+        style["punctuation_usage"]
+    )
+
+def upload_result(result, fields):
+    """Project a stored upload analysis onto the requested fields, a subset of STORED_FIELDS"""
+    entry = {"statistics": {"statistics": result["statistics"]} if "statistics" in fields else {}}
+    if "style_metrics" in fields:
+        entry["style_metrics"] = result["style_metrics"]
+    return entry
+
+def request_user_id(data=None):
+    """User identifier from the X-User-Id header, or a user_id value in `data`"""
+    user_id = request.headers.get('X-User-Id') or (data or {}).get('user_id')
+    return str(user_id) if user_id else None
+
+def load_style_profile(user_id):
+    """The user's style profile, or None if unknown or unavailable"""
+    store = get_style_profiles()
+    if not user_id or store is None:
+        return None
+    try:
+        return store.get(user_id)
+    except Exception as e:
+        print(f"Error loading style profile: {e}")
+        return None
+
+# Fields the outline itself reads, whatever the response is narrowed to: statistics and
+# style metrics for the prompt, entities for the context line and key sentence ranking
+OUTLINE_FIELDS = frozenset({"statistics", "style_metrics", "named_entities"})
+
+def outline_fields(fields):
+    """Fields the outline needs on top of the requested ones, or None for all"""
+    return None if fields is None else fields | OUTLINE_FIELDS
+
+def select_style_examples(text_analysis, style_analysis, k=5):
+    """
+    Corpus posts closest to the text's style, or the cached default examples without an index.
+
+    Both sources return {"row", "distance", "features"} dicts; the default examples
+    have no row or distance.
+    """
+    index = get_style_index()
+    if index is None:
+        return [{"row": None, "distance": None, "features": style_features(example, example)}
+                for example in get_style_examples()]
+    with metrics.span("style_index_query"):
+        return index.nearest_examples(text_analysis, style_analysis, k=k)
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy"})
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus-style stage timings, request counters and cache statistics"""
+    extra = []
+    if is_loaded("llm_client"):
+        cache_stats = get_llm_client().stats()
+        for name in ("hits", "disk_hits", "misses"):
+            extra.extend([
+                f"# TYPE cognito_llm_cache_{name}_total counter",
+                f"cognito_llm_cache_{name}_total {cache_stats[name]}"
+            ])
+    paragraph_stats = incremental_analyzer.stats()
+    extra.extend([
+        "# TYPE cognito_paragraph_cache_hits_total counter",
+        f"cognito_paragraph_cache_hits_total {paragraph_stats['hits']}",
+        "# TYPE cognito_paragraph_cache_misses_total counter",
+        f"cognito_paragraph_cache_misses_total {paragraph_stats['misses']}",
+    ])
+    if is_loaded("result_store") and get_result_store() is not None:
+        store_stats = get_result_store().stats()
+        for name in ("hits", "misses"):
+            extra.extend([
+                f"# TYPE cognito_result_store_{name}_total counter",
+                f"cognito_result_store_{name}_total {store_stats[name]}"
+            ])
+    session_stats = writer_block_detector.stats()
+    extra.extend([
+        "# TYPE cognito_writer_block_sessions gauge",
+        f"cognito_writer_block_sessions {session_stats['sessions']}",
+        "# TYPE cognito_writer_block_evicted_sessions_total counter",
+        f"cognito_writer_block_evicted_sessions_total {session_stats['evicted']}",
+    ])
+    return Response(metrics.render_prometheus(extra), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/secret', methods=['GET'])
 def get_secret():
     """Endpoint to securely get the OpenAI API key"""
@@ -130,38 +323,175 @@ def upload_files():
     if not files:
         return jsonify({"error": "No files selected"}), 400
 
-    analysis_results = []
+    try:
+        fields = parse_fields(request.form.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    with_style = fields is None or "style_metrics" in fields
+    user_id = request_user_id(request.form)
+    profiled = fields is None or {"statistics", "style_metrics"} <= fields
+    # The store keeps no document text or entities, so it only serves requests without them
+    servable = fields is not None and fields <= STORED_FIELDS
+
+    # Read every upload into memory; unsupported files get an error entry
+    entries = []
+    uploads = []
     for file in files:
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-
-            try:
-                # Extract text from file based on file type
-                text = extract_text_from_file(filepath)
-                
-                # Analyze writing style
-                analysis = analyze_writing_style(text)
-                text_stats = preprocess_text(text)
-                
-                analysis_results.append({
-                    "filename": filename,
-                    "statistics": text_stats,
-                    "style_metrics": analysis["style_metrics"]
-                })
-
-            except Exception as e:
-                return jsonify({"error": f"Error processing file {filename}: {str(e)}"}), 500
-            finally:
-                # Clean up temporary file
-                os.remove(filepath)
+        if not file or not file.filename:
+            continue
+        filename = secure_filename(file.filename)
+        if not allowed_file(filename):
+            entries.append({"filename": filename, "status": "error", "error": "Unsupported file type"})
+            continue
+        entries.append({"filename": filename})
+        uploads.append((filename, file.read()))
+
+    # Files analysed before are served from the result store without extraction or parsing
+    pending = [entry for entry in entries if "status" not in entry]
+    digests = [content_hash(data) for _, data in uploads]
+    analyzer = analyzer_key(UPLOAD_PIPELINE_PROFILE)
+    store = get_result_store()
+    stored = {}
+    if store is not None and servable:
+        try:
+            stored = store.get_many(digests, analyzer)
+        except Exception as e:
+            print(f"Error reading stored analyses: {e}")
+
+    missing = []
+    documents = []
+    for entry, digest, upload in zip(pending, digests, uploads):
+        if digest in stored:
+            result = stored[digest]
+            entry.update({"status": "success", "cached": True, **upload_result(result, fields)})
+            documents.append((digest, stored_profile(result)))
+        else:
+            missing.append((entry, digest, upload))
+
+    # Extract the remaining files in parallel on the upload process pool
+    texts = []
+    analysed = []
+    for (entry, digest, _), (text, error) in zip(missing, extract_texts([upload for _, _, upload in missing])):
+        if error is not None:
+            entry.update({"status": "error", "error": f"Error processing file {entry['filename']}: {error}"})
+        else:
+            texts.append(text)
+            analysed.append((entry, digest))
+
+    # Parse every extracted text in a single nlp.pipe pass
+    try:
+        analyses = list(iter_text_analyses(texts, n_process=UPLOAD_NLP_PROCESSES,
+                                           profile=UPLOAD_PIPELINE_PROFILE, fields=fields))
+    except Exception as e:
+        print(f"Batched analysis failed, analysing files one by one: {e}")
+        analyses = [None] * len(texts)
+
+    results = []
+    for (entry, digest), text, analysis in zip(analysed, texts, analyses):
+        try:
+            if analysis is None:
+                analysis = TextAnalysis(text, profile=UPLOAD_PIPELINE_PROFILE, fields=fields)
+            entry.update({"status": "success", "statistics": preprocess_text(text, analysis, fields)})
+            if with_style:
+                entry["style_metrics"] = analyze_writing_style(text, analysis)["style_metrics"]
+            if profiled:
+                documents.append((digest, StyleProfile.from_partial(analysis.aggregates)))
+                # Stored only where a later request can be served from it
+                if servable:
+                    results.append((digest, stored_result(entry, analysis)))
+        except Exception as e:
+            entry.update({"status": "error", "error": f"Error processing file {entry['filename']}: {str(e)}"})
+
+    # One batched write for every new analysis
+    if store is not None and results:
+        try:
+            store.put_many(results, analyzer)
+        except Exception as e:
+            print(f"Error storing analyses: {e}")
+
+    # Fold the new documents into the user's running style profile
+    profile_store = get_style_profiles()
+    if user_id and documents and profile_store is not None:
+        try:
+            profile_store.add_documents(user_id, documents)
+        except Exception as e:
+            print(f"Error updating style profile: {e}")
+
+    succeeded = sum(1 for entry in entries if entry["status"] == "success")
+    if entries and not succeeded:
+        return jsonify({"error": "No files could be processed", "results": entries}), 500
 
     return jsonify({
-        "message": "Files processed successfully",
-        "results": analysis_results
+        "message": "Files processed successfully" if succeeded == len(entries)
+                   else f"Processed {succeeded} of {len(entries)} files",
+        "results": entries
     })
 
+@app.route('/api/analyze', methods=['POST'])
+def analyze_text():
+    """Analyze editor text incrementally, re-parsing only changed paragraphs"""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    text = data.get('text')
+    if not text:
+        return jsonify({"error": "No text provided"}), 400
+
+    try:
+        fields = parse_fields(data.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        # Cached paragraph analyses hold every field; only the response is projected
+        analysis = incremental_analyzer.analyze(text)
+        result = {"statistics": analysis.statistics(fields)}
+        if fields is None or "style_metrics" in fields:
+            result["style_metrics"] = analysis.style()["style_metrics"]
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({"error": f"Error analyzing text: {str(e)}"}), 500
+
+@app.route('/api/style-profile', methods=['GET'])
+def get_style_profile():
+    """Running style statistics of a user across their uploads"""
+    # The user id is a client-supplied label, not an authenticated identity
+    user_id = request_user_id(request.args)
+    if not user_id:
+        return jsonify({"error": "No user_id provided"}), 400
+    profile = load_style_profile(user_id)
+    if profile is None:
+        return jsonify({"error": "No style profile for this user"}), 404
+    return jsonify({"user_id": user_id, "profile": profile.summary()})
+
+@app.route('/api/writer-block/events', methods=['POST'])
+def writer_block_events():
+    """Record editor events for a session and return its writer's block status"""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    session_id = data.get('session_id')
+    if not session_id:
+        return jsonify({"error": "No session_id provided"}), 400
+
+    events = data.get('events', [])
+    if not isinstance(events, list):
+        return jsonify({"error": "events must be a list"}), 400
+
+    try:
+        writer_block_detector.record_events(str(session_id), events)
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({"error": f"Invalid event: {str(e)}"}), 400
+    return jsonify(writer_block_detector.detect(str(session_id)))
+
+@app.route('/api/writer-block/<session_id>', methods=['GET'])
+def writer_block_status(session_id):
+    """Writer's block status of a session"""
+    return jsonify(writer_block_detector.detect(session_id))
+
 @app.route('/api/generate-outline', methods=['POST'])
 def create_outline():
     """Generate an outline from brain dump text"""
@@ -175,31 +505,96 @@ def create_outline():
         return jsonify({"error": "No text provided"}), 400
 
     try:
-        # Analyze the input text
-        text_analysis = preprocess_text(text)
-        style_analysis = analyze_writing_style(text)
+        fields = parse_fields(data.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        # Get writing style examples from the dataset
-        style_samples = blog_dataset.get_sample(n=5)
-        processed_samples = batch_process_texts([sample['text'] for sample in style_samples])
+    try:
+        # Analyze the input text, parsing it only once
+        analysis = TextAnalysis(text, fields=outline_fields(fields))
+        text_analysis = preprocess_text(text, analysis)
+        style_analysis = analyze_writing_style(text, analysis)
 
         # Generate outline based on text analysis and style examples
-        outline = generate_outline(
-            text=text,
-            text_analysis=text_analysis,
-            style_analysis=style_analysis,
-            style_examples=processed_samples
-        )
-
-        return jsonify({
-            "outline": outline,
-            "statistics": text_analysis,
-            "style_metrics": style_analysis["style_metrics"]
-        })
+        with metrics.span("outline_generation"):
+            outline = generate_outline(
+                text=text,
+                text_analysis=text_analysis,
+                style_analysis=style_analysis,
+                style_examples=select_style_examples(text_analysis, style_analysis),
+                analysis=analysis,
+                style_profile=load_style_profile(request_user_id(data))
+            )
+
+        result = {"outline": outline, "statistics": text_analysis if fields is None else analysis.statistics(fields)}
+        if fields is None or "style_metrics" in fields:
+            result["style_metrics"] = style_analysis["style_metrics"]
+        return jsonify(result)
 
     except Exception as e:
         return jsonify({"error": f"Error generating outline: {str(e)}"}), 500
 
+@app.route('/api/generate-outline/stream', methods=['POST'])
+def stream_outline():
+    """Generate an outline, streaming statistics and then each section as NDJSON events"""
+    if not request.is_json:
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    data = request.get_json()
+    text = data.get('text')
+
+    if not text:
+        return jsonify({"error": "No text provided"}), 400
+
+    try:
+        fields = parse_fields(data.get('fields'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    user_id = request_user_id(data)
+
+    def generate():
+        # The request's own span collection has ended by the time the stream is consumed
+        token = metrics.start_request()
+        try:
+            # A single parse is all that stands before the first event
+            analysis = TextAnalysis(text, fields=outline_fields(fields))
+            text_analysis = preprocess_text(text, analysis)
+            style_analysis = analyze_writing_style(text, analysis)
+            event = {
+                "event": "analysis",
+                "statistics": text_analysis if fields is None else analysis.statistics(fields)
+            }
+            if fields is None or "style_metrics" in fields:
+                event["style_metrics"] = style_analysis["style_metrics"]
+            yield json.dumps(event) + "\n"
+
+            for event in iter_outline(
+                text=text,
+                text_analysis=text_analysis,
+                style_analysis=style_analysis,
+                style_examples=select_style_examples(text_analysis, style_analysis),
+                analysis=analysis,
+                style_profile=load_style_profile(user_id)
+            ):
+                yield json.dumps(event) + "\n"
+
+        except Exception as e:
+            yield json.dumps({"event": "error", "error": f"Error generating outline: {str(e)}"}) + "\n"
+
+        try:
+            # Headers went out with the first event, so stage timings close the stream instead
+            if SERVER_TIMING:
+                yield json.dumps({"event": "timing", "server_timing": metrics.server_timing_header(metrics.request_spans())}) + "\n"
+        finally:
+            metrics.end_request(token)
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    # Stop reverse proxies from buffering the stream
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/generate-outline', methods=['OPTIONS'])
 def handle_preflight():
     response = jsonify({})
@@ -210,32 +605,9 @@ def handle_preflight():
         response.headers.add('Access-Control-Allow-Origin', origin)
     else:
         response.headers.add('Access-Control-Allow-Origin', 'chrome-extension://abahnimgbnbihioopdehkbkpabaooepe')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization, Accept')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type, Authorization, Accept, X-User-Id')
     response.headers.add('Access-Control-Allow-Methods', 'POST, OPTIONS')
     return response
 
-def extract_text_from_file(filepath):
-    """Extract text from various file formats"""
-    ext = filepath.rsplit('.', 1)[1].lower()
-    
-    if ext == 'txt':
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
-    
-    elif ext == 'pdf':
-        # Use PyPDF2 for PDF extraction
-        from PyPDF2 import PdfReader
-        reader = PdfReader(filepath)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-        return text
-    
-    elif ext in ['doc', 'docx']:
-        # Use python-docx for Word documents
-        from docx import Document
-        doc = Document(filepath)
-        return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-
 if __name__ == '__main__':
     app.run(debug=True, host='127.0.0.1', port=5002) 
\ No newline at end of file
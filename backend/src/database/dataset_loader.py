@@ -1,59 +1,275 @@
-from datasets import load_dataset
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Tuple, Union
+import json
+import os
+import numpy as np
+from ..settings import CACHE_DIR
+
+DATASET_NAME = "barilan/blog_authorship_corpus"
+
+# Author attributes that can be used to filter samples
+CATEGORICAL_FIELDS = ("gender", "job", "horoscope")
+NUMERIC_FIELDS = ("age",)
+
+# Sidecar cache for get_stats, bump the version when the stats format changes
+STATS_CACHE_PATH = os.path.join(CACHE_DIR, "dataset_stats.json")
+STATS_VERSION = 2
+TEXT_LENGTH_BINS = (0, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, np.inf)
 
 class BlogDatasetLoader:
     def __init__(self):
-        self.dataset_name = "barilan/blog_authorship_corpus"
+        self.dataset_name = DATASET_NAME
         self.dataset = None
+        # (split, field) -> precomputed row index arrays, built on first use
+        self._indexes: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # (fingerprint, stats) once get_stats has run
+        self._stats: Optional[Tuple[Optional[str], Dict[str, Any]]] = None
 
-    def load_dataset(self) -> None:
+    def load_dataset(self, keep_in_memory: bool = False) -> None:
         """
         Load the Blog Authorship Corpus dataset from Hugging Face.
         The dataset contains blog posts with author metadata including age, gender, job, and horoscope.
+
+        Args:
+            keep_in_memory (bool): Copy the corpus into RAM instead of memory-mapping the Arrow cache files
         """
+        # Imported lazily, the datasets library is slow to import
+        from datasets import load_dataset
+
         try:
-            self.dataset = load_dataset(self.dataset_name, trust_remote_code=True)
+            self.dataset = load_dataset(self.dataset_name, trust_remote_code=True, keep_in_memory=keep_in_memory)
+            self._indexes = {}
+            self._stats = None
             print(f"Dataset loaded successfully. Train size: {len(self.dataset['train'])}")
             print(f"Validation size: {len(self.dataset['validation'])}")
         except Exception as e:
             print(f"Error loading dataset: {str(e)}")
             raise
 
-    def get_sample(self, split: str = 'train', n: int = 5) -> list:
+    def _column(self, split: str, field: str):
         """
-        Get a sample of n entries from the specified split.
+        Arrow column of a split, read straight from the (memory-mapped) table.
+
+        Row positions match dataset rows because freshly loaded splits have no indices mapping.
+        """
+        return self.dataset[split].data.column(field)
+
+    def _categorical_index(self, split: str, field: str) -> Dict[str, Any]:
+        """Row ids grouped by value: rows with value v are order[offsets[i]:offsets[i + 1]]"""
+        key = (split, field)
+        if key not in self._indexes:
+            import pyarrow.compute as pc
+            encoded = pc.dictionary_encode(self._column(split, field).combine_chunks())
+            codes = pc.fill_null(encoded.indices, -1).to_numpy()
+            values = encoded.dictionary.to_pylist()
+            valid = codes >= 0
+            order = np.flatnonzero(valid)[np.argsort(codes[valid], kind='stable')]
+            counts = np.bincount(codes[valid], minlength=len(values))
+            self._indexes[key] = {
+                "values": {value: i for i, value in enumerate(values)},
+                "order": order,
+                "offsets": np.concatenate([[0], np.cumsum(counts)])
+            }
+        return self._indexes[key]
+
+    def _numeric_index(self, split: str, field: str) -> Dict[str, Any]:
+        """Row ids sorted by value, for range lookups with a binary search"""
+        key = (split, field)
+        if key not in self._indexes:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            column = self._column(split, field)
+            if not pa.types.is_integer(column.type):
+                column = pc.cast(column, pa.int64())
+            values = column.combine_chunks().to_numpy(zero_copy_only=False)
+            order = np.argsort(values, kind='stable')
+            self._indexes[key] = {"order": order, "sorted": values[order]}
+        return self._indexes[key]
+
+    def _rows_with_values(self, split: str, field: str, values: Union[Any, Iterable[Any]]) -> np.ndarray:
+        index = self._categorical_index(split, field)
+        if isinstance(values, (str, int)):
+            values = [values]
+        feature = self.dataset[split].features[field]
+        parts = []
+        for value in values:
+            # ClassLabel columns store integer codes
+            if isinstance(value, str) and hasattr(feature, 'str2int'):
+                value = feature.str2int(value)
+            i = index["values"].get(value)
+            if i is not None:
+                parts.append(index["order"][index["offsets"][i]:index["offsets"][i + 1]])
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def _rows_in_range(self, split: str, field: str, bounds: Union[int, Tuple[int, int]]) -> np.ndarray:
+        index = self._numeric_index(split, field)
+        low, high = (bounds, bounds) if isinstance(bounds, int) else bounds
+        start = np.searchsorted(index["sorted"], low, side='left')
+        stop = np.searchsorted(index["sorted"], high, side='right')
+        return np.sort(index["order"][start:stop])
+
+    def matching_rows(self, split: str = 'train', age: Optional[Union[int, Tuple[int, int]]] = None,
+                      **attributes: Any) -> Optional[np.ndarray]:
+        """
+        Row ids matching the given author attributes, using the precomputed indexes.
         
         Args:
             split (str): Dataset split ('train' or 'validation')
-            n (int): Number of samples to return
+            age (int or Tuple[int, int], optional): Exact age or inclusive (min, max) age bracket
+            **attributes: Values (or lists of values) for gender, job or horoscope
             
         Returns:
-            list: List of n samples from the dataset
+            Sorted array of matching row ids, or None when no filter was given
         """
         if self.dataset is None:
             raise ValueError("Dataset not loaded. Call load_dataset() first.")
-        
-        samples = self.dataset[split].select(range(n))
-        return [dict(sample) for sample in samples]
 
-    def get_stats(self) -> Dict[str, Any]:
+        candidates = None
+        if age is not None:
+            candidates = self._rows_in_range(split, "age", age)
+        for field, values in attributes.items():
+            if field not in CATEGORICAL_FIELDS:
+                raise ValueError(f"Cannot filter on {field}, expected one of {CATEGORICAL_FIELDS + NUMERIC_FIELDS}")
+            if values is None:
+                continue
+            rows = self._rows_with_values(split, field, values)
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+        return candidates
+
+    def get_sample(self, split: str = 'train', n: int = 5, shuffle: bool = False, seed: Optional[int] = None,
+                   age: Optional[Union[int, Tuple[int, int]]] = None, **attributes: Any) -> list:
         """
-        Get basic statistics about the dataset.
+        Get a sample of n entries from the specified split.
+
+        Filtering and sampling work on index arrays over the Arrow table, so only
+        the selected rows are ever turned into Python objects.
         
+        Args:
+            split (str): Dataset split ('train' or 'validation')
+            n (int): Number of samples to return
+            shuffle (bool): Draw a random sample instead of the first matching rows
+            seed (int, optional): Seed for reproducible random samples
+            age (int or Tuple[int, int], optional): Exact age or inclusive (min, max) age bracket
+            **attributes: Values (or lists of values) for gender, job or horoscope
+            
         Returns:
-            Dict containing dataset statistics
+            list: List of up to n samples from the dataset
         """
         if self.dataset is None:
             raise ValueError("Dataset not loaded. Call load_dataset() first.")
-        
+
+        candidates = self.matching_rows(split, age=age, **attributes)
+        total = len(self.dataset[split]) if candidates is None else len(candidates)
+        n = min(n, total)
+
+        if shuffle:
+            picks = np.random.default_rng(seed).choice(total, size=n, replace=False)
+            # Sorted ids keep reads from the memory-mapped table sequential
+            positions = np.sort(picks)
+        else:
+            positions = np.arange(n)
+        indices = positions if candidates is None else candidates[positions]
+
+        samples = self.dataset[split].select(indices)
+        return [dict(sample) for sample in samples]
+
+    def _fingerprint(self) -> Optional[str]:
+        """Identifier of the loaded dataset contents, None if a split has no fingerprint"""
+        fingerprints = [getattr(self.dataset[split], '_fingerprint', None) for split in sorted(self.dataset.keys())]
+        if not all(fingerprints):
+            return None
+        return f"{self.dataset_name}:{':'.join(fingerprints)}"
+
+    def _compute_stats(self) -> Dict[str, Any]:
+        """Dataset statistics computed with Arrow/NumPy column operations"""
+        import pyarrow.compute as pc
+
         train_data = self.dataset['train']
-        stats = {
+
+        def label(field: str, value: Any) -> Any:
+            # ClassLabel columns store integer codes
+            feature = train_data.features[field]
+            return feature.int2str(value) if hasattr(feature, 'int2str') else value
+
+        def value_counts(field: str) -> Dict[str, int]:
+            counts = pc.value_counts(self._column('train', field)).to_pylist()
+            counts.sort(key=lambda item: item["counts"], reverse=True)
+            return {str(label(field, item["values"])): item["counts"] for item in counts}
+
+        def unique(field: str) -> list:
+            return sorted(label(field, value) for value in pc.unique(self._column('train', field)).to_pylist())
+
+        lengths = pc.utf8_length(self._column('train', 'text')).to_numpy()
+        histogram, _ = np.histogram(lengths, bins=TEXT_LENGTH_BINS)
+
+        return {
             "total_train_samples": len(train_data),
             "total_validation_samples": len(self.dataset['validation']),
             "fields": list(train_data.features.keys()),
-            "age_groups": set(train_data['age']),
-            "unique_jobs": set(train_data['job']),
+            "age_groups": unique('age'),
+            "unique_jobs": unique('job'),
+            "age_counts": value_counts('age'),
+            "gender_counts": value_counts('gender'),
+            "job_counts": value_counts('job'),
+            "text_length": {
+                "min": int(lengths.min()) if len(lengths) else 0,
+                "max": int(lengths.max()) if len(lengths) else 0,
+                "mean": round(float(lengths.mean()), 2) if len(lengths) else 0,
+                "percentiles": {
+                    str(pct): int(value)
+                    for pct, value in zip((50, 90, 99), np.percentile(lengths, (50, 90, 99)) if len(lengths) else (0, 0, 0))
+                },
+                "histogram": {
+                    "bin_edges": [int(edge) for edge in TEXT_LENGTH_BINS[:-1]] + ["inf"],
+                    "counts": histogram.tolist()
+                }
+            }
         }
+
+    def get_stats(self, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Get basic statistics about the dataset.
+
+        Statistics are computed column-wise on the Arrow data and stored in a
+        sidecar file keyed by the dataset fingerprint, so later calls (and later
+        processes) are served from the cache.
+        
+        Args:
+            use_cache (bool): Read and write the sidecar cache
+            
+        Returns:
+            Dict containing dataset statistics
+        """
+        if self.dataset is None:
+            raise ValueError("Dataset not loaded. Call load_dataset() first.")
+
+        fingerprint = self._fingerprint()
+        if use_cache and self._stats is not None and self._stats[0] == fingerprint:
+            return self._stats[1]
+
+        if use_cache and fingerprint is not None:
+            try:
+                with open(STATS_CACHE_PATH, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if cached.get("version") == STATS_VERSION and cached.get("fingerprint") == fingerprint:
+                    self._stats = (fingerprint, cached["stats"])
+                    return cached["stats"]
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError) as e:
+                print(f"Ignoring unreadable dataset stats cache: {e}")
+
+        stats = self._compute_stats()
+
+        if use_cache and fingerprint is not None:
+            self._stats = (fingerprint, stats)
+            os.makedirs(os.path.dirname(STATS_CACHE_PATH), exist_ok=True)
+            tmp_path = f"{STATS_CACHE_PATH}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": STATS_VERSION, "fingerprint": fingerprint, "stats": stats}, f)
+            os.replace(tmp_path, STATS_CACHE_PATH)
+
         return stats
 
 if __name__ == "__main__":
@@ -72,4 +288,9 @@ if __name__ == "__main__":
     samples = loader.get_sample(n=2)
     for sample in samples:
         print(f"\nBlog post: {sample['text'][:200]}...")
+        print(f"Author: {sample['gender']}, Age: {sample['age']}, Job: {sample['job']}")
+
+    # Random, attribute-filtered sample
+    print("\nRandom posts by authors aged 20-30:")
+    for sample in loader.get_sample(n=2, shuffle=True, seed=0, age=(20, 30)):
         print(f"Author: {sample['gender']}, Age: {sample['age']}, Job: {sample['job']}") 
\ No newline at end of file
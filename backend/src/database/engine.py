@@ -0,0 +1,34 @@
+"""
+SQLAlchemy engines shared by the database-backed stores.
+"""
+import os
+import threading
+from typing import Any, Dict
+
+_engines: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_engine(url: str) -> Any:
+    """
+    Engine for a database URL, created once per process and shared by every store using it.
+
+    The directory of a SQLite database file is created if it does not exist yet.
+    
+    Args:
+        url (str): SQLAlchemy database URL
+        
+    Returns:
+        sqlalchemy.engine.Engine
+    """
+    with _lock:
+        engine = _engines.get(url)
+        if engine is None:
+            from sqlalchemy import create_engine
+
+            if url.startswith("sqlite:///"):
+                directory = os.path.dirname(url[len("sqlite:///"):])
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            engine = _engines[url] = create_engine(url, pool_pre_ping=True)
+        return engine
@@ -0,0 +1,141 @@
+"""
+Persistent store of upload analysis results, keyed by content hash.
+
+Results are stored per (content hash, analyzer) where the analyzer string
+combines `ANALYSIS_VERSION` and the result layout version with the pipeline
+profile, so a change to any of them misses the old rows instead of serving
+stale analyses; rows of earlier versions are deleted when the store is opened. Only numeric
+statistics and style metrics are stored, never document text (lemmas, common
+words) or named entities. SQLite is used by default and any SQLAlchemy URL
+(e.g. Postgres) works through `DATABASE_URL`.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+from ..settings import DATABASE_URL
+from .engine import get_engine
+from ..nlp_processing.analysis import ANALYSIS_VERSION
+
+# Upload output fields a stored result can serve
+STORED_FIELDS = frozenset({"statistics", "style_metrics"})
+# Bump when the layout of stored results changes
+RESULT_FORMAT_VERSION = 2
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 of the raw upload bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+def _analyzer_prefix() -> str:
+    return f"v{ANALYSIS_VERSION}.{RESULT_FORMAT_VERSION}/"
+
+def analyzer_key(profile: str) -> str:
+    """Identifies the analysis code, result layout and pipeline that produced a result"""
+    return f"{_analyzer_prefix()}{profile}"
+
+
+class ResultStore:
+    """Batched reads and writes of analysis results; safe to share between threads"""
+
+    # Rows per INSERT / IN (...) lookup
+    BATCH_SIZE = 500
+
+    def __init__(self, url: str = DATABASE_URL):
+        """
+        Args:
+            url (str): SQLAlchemy database URL
+        """
+        from sqlalchemy import Column, DateTime, MetaData, String, Table, Text
+
+        self.engine = get_engine(url)
+        self.metadata = MetaData()
+        self.results = Table(
+            "analysis_results", self.metadata,
+            Column("content_hash", String(64), primary_key=True),
+            Column("analyzer", String(64), primary_key=True),
+            Column("result", Text, nullable=False),
+            Column("created_at", DateTime(timezone=True), nullable=False),
+        )
+        self.metadata.create_all(self.engine)
+        self.purge_outdated()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, hashes: Iterable[str], analyzer: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up stored results.
+        
+        Args:
+            hashes (Iterable[str]): Content hashes
+            analyzer (str): Analyzer key from `analyzer_key`
+            
+        Returns:
+            Dict of content hash -> stored result, for the hashes that were found
+        """
+        from sqlalchemy import select
+
+        hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, Dict[str, Any]] = {}
+        with self.engine.connect() as connection:
+            for start in range(0, len(hashes), self.BATCH_SIZE):
+                query = select(self.results.c.content_hash, self.results.c.result).where(
+                    self.results.c.analyzer == analyzer,
+                    self.results.c.content_hash.in_(hashes[start:start + self.BATCH_SIZE])
+                )
+                for row in connection.execute(query):
+                    found[row.content_hash] = json.loads(row.result)
+        self.hits += len(found)
+        self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], analyzer: str) -> int:
+        """
+        Store results in one transaction, keeping existing rows for the same key.
+        
+        Args:
+            items (Iterable[Tuple[str, Dict]]): (content hash, result) pairs
+            analyzer (str): Analyzer key from `analyzer_key`
+            
+        Returns:
+            int: Number of rows sent to the database
+        """
+        now = datetime.now(timezone.utc)
+        rows: Dict[str, Dict[str, Any]] = {}
+        for digest, result in items:
+            rows[digest] = {"content_hash": digest, "analyzer": analyzer,
+                            "result": json.dumps(result), "created_at": now}
+        if not rows:
+            return 0
+
+        values: List[Dict[str, Any]] = list(rows.values())
+        with self.engine.begin() as connection:
+            statement = self._insert_ignoring_duplicates()
+            for start in range(0, len(values), self.BATCH_SIZE):
+                connection.execute(statement, values[start:start + self.BATCH_SIZE])
+        return len(values)
+
+    def _insert_ignoring_duplicates(self) -> Any:
+        dialect = self.engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+            return insert(self.results).on_conflict_do_nothing()
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+            return insert(self.results).on_conflict_do_nothing()
+        return self.results.insert().prefix_with("IGNORE") if dialect == "mysql" else self.results.insert()
+
+    def purge_outdated(self) -> int:
+        """Delete results of earlier analysis versions or layouts, which are never read again, returning how many"""
+        with self.engine.begin() as connection:
+            return connection.execute(
+                self.results.delete().where(~self.results.c.analyzer.startswith(_analyzer_prefix()))
+            ).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters"""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(self.results.delete())
@@ -0,0 +1,104 @@
+"""
+Persistent per-user style profiles.
+
+Each user has one row holding their running style statistics and a row per
+document already merged into it, so re-uploading a document does not count
+it twice. Uses the same database as the result store (`DATABASE_URL`).
+"""
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Tuple
+from ..settings import DATABASE_URL
+from .engine import get_engine
+from ..models.style_profile import StyleProfile
+
+
+class StyleProfileStore:
+    """Reads and incremental updates of user style profiles; safe to share between threads"""
+
+    def __init__(self, url: str = DATABASE_URL):
+        """
+        Args:
+            url (str): SQLAlchemy database URL
+        """
+        from sqlalchemy import Column, DateTime, MetaData, String, Table, Text
+
+        self.engine = get_engine(url)
+        self.metadata = MetaData()
+        self.profiles = Table(
+            "style_profiles", self.metadata,
+            Column("user_id", String(128), primary_key=True),
+            Column("profile", Text, nullable=False),
+            Column("updated_at", DateTime(timezone=True), nullable=False),
+        )
+        self.documents = Table(
+            "style_profile_documents", self.metadata,
+            Column("user_id", String(128), primary_key=True),
+            Column("content_hash", String(64), primary_key=True),
+        )
+        self.metadata.create_all(self.engine)
+        # Serialises read-modify-write updates within the process; rows are also locked where supported
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[StyleProfile]:
+        """
+        The user's profile, or None if nothing has been added for them yet.
+        
+        Args:
+            user_id (str): User identifier
+        """
+        from sqlalchemy import select
+
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(self.profiles.c.profile).where(self.profiles.c.user_id == user_id)
+            ).first()
+        return StyleProfile.from_dict(json.loads(row.profile)) if row else None
+
+    def add_documents(self, user_id: str, documents: Iterable[Tuple[str, StyleProfile]]) -> Optional[StyleProfile]:
+        """
+        Merge documents into the user's profile in one transaction, skipping ones merged before.
+        
+        Args:
+            user_id (str): User identifier
+            documents (Iterable[Tuple[str, StyleProfile]]): (content hash, single-document profile) pairs
+            
+        Returns:
+            The updated profile, or None if the user has no documents
+        """
+        from sqlalchemy import select
+
+        documents = dict(documents)
+        with self._lock, self.engine.begin() as connection:
+            row = connection.execute(
+                select(self.profiles.c.profile).where(self.profiles.c.user_id == user_id).with_for_update()
+            ).first()
+            profile = StyleProfile.from_dict(json.loads(row.profile)) if row else None
+            if not documents:
+                return profile
+
+            seen = {
+                digest for (digest,) in connection.execute(
+                    select(self.documents.c.content_hash).where(
+                        self.documents.c.user_id == user_id,
+                        self.documents.c.content_hash.in_(list(documents))
+                    )
+                )
+            }
+            new = [(digest, document) for digest, document in documents.items() if digest not in seen]
+            if not new:
+                return profile
+
+            if profile is None:
+                profile = StyleProfile()
+            for _, document in new:
+                profile.merge(document)
+
+            connection.execute(self.documents.insert(), [{"user_id": user_id, "content_hash": digest} for digest, _ in new])
+            values = {"profile": json.dumps(profile.to_dict()), "updated_at": datetime.now(timezone.utc)}
+            if row:
+                connection.execute(self.profiles.update().where(self.profiles.c.user_id == user_id).values(**values))
+            else:
+                connection.execute(self.profiles.insert().values(user_id=user_id, **values))
+            return profile
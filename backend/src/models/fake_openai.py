@@ -0,0 +1,47 @@
+import hashlib
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+
+def _default_responder(model: str, messages: List[Dict[str, str]]) -> str:
+    """Deterministic canned answer derived from the last user message"""
+    prompt = messages[-1]["content"] if messages else ""
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+    return "\n".join(f"Point {i} ({digest}): expand on this idea with a concrete example." for i in range(1, 5))
+
+
+class FakeChatClient:
+    """
+    Offline stand-in for the OpenAI client.
+
+    Answers `client.chat.completions.create(...)` locally, optionally after a
+    simulated network latency, and counts the calls it receives. Useful for
+    exercising the LLM cache and outline generation without network access.
+    """
+
+    def __init__(self, responder: Optional[Callable[[str, List[Dict[str, str]]], str]] = None,
+                 latency: float = 0.0):
+        """
+        Args:
+            responder (callable, optional): Maps (model, messages) to the response content
+            latency (float): Seconds to sleep before answering each call
+        """
+        self.responder = responder or _default_responder
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model: str, messages: List[Dict[str, str]], **params) -> SimpleNamespace:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        content = self.responder(model, messages)
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")]
+        )
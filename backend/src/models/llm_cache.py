@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Tuple
+
+
+def _completion(content: str) -> SimpleNamespace:
+    """Minimal stand-in for an OpenAI chat completion carrying only the message content"""
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+def cache_key(model: str, messages: List[Dict[str, str]], temperature: Optional[float], **params: Any) -> str:
+    """
+    Content-addressed key for a chat completion request.
+
+    Args:
+        model (str): Model name
+        messages (List[Dict[str, str]]): Chat messages
+        temperature (float, optional): Sampling temperature
+        **params: Any other request parameters that affect the response
+
+    Returns:
+        Hex SHA-256 digest of the canonicalised request
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "params": params},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CachedChatClient:
+    """
+    Caching wrapper around an OpenAI client.
+
+    Exposes the same `client.chat.completions.create(...)` call. Responses are
+    keyed by model, messages, temperature and any other request parameters, and
+    kept in an in-memory LRU backed by an optional SQLite tier. Both tiers
+    honour the TTL. Pass `use_cache=False` to a call, or `enabled=False` to the
+    wrapper, to bypass the cache.
+    """
+
+    def __init__(self, client: Any, max_entries: int = 512, ttl: Optional[float] = 24 * 60 * 60,
+                 db_path: Optional[str] = None, enabled: bool = True):
+        """
+        Args:
+            client: Wrapped OpenAI (or compatible) client
+            max_entries (int): Capacity of the in-memory LRU
+            ttl (float, optional): Seconds a cached response stays valid, None for no expiry
+            db_path (str, optional): SQLite file for the on-disk tier, None to disable it;
+                expired rows are deleted when it is opened and on every write
+            enabled (bool): Whether caching is active at all
+        """
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            with self._lock:
+                self._purge_expired()
+
+        # Mirror the OpenAI client layout so callers keep using client.chat.completions.create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _purge_expired(self) -> None:
+        # Caller must hold the lock; keeps the disk tier bounded by what the TTL allows
+        if self._db is not None and self.ttl is not None:
+            self._db.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+            self._db.commit()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                content, created_at = entry
+                if not self._expired(created_at):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return content
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    content, created_at = row
+                    if not self._expired(created_at):
+                        self._remember(key, content, created_at)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return content
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def _remember(self, key: str, content: str, created_at: float) -> None:
+        # Caller must hold the lock
+        self._memory[key] = (content, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _put(self, key: str, content: str) -> None:
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, content, created_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, content, created_at) VALUES (?, ?, ?)",
+                    (key, content, created_at)
+                )
+                self._db.commit()
+                self._purge_expired()
+
+    def create(self, model: str, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+               use_cache: bool = True, **params: Any) -> Any:
+        """
+        Cached equivalent of `client.chat.completions.create`.
+
+        Returns:
+            The upstream response on a miss, or a lightweight completion with the cached content on a hit
+        """
+        request = dict(model=model, messages=messages, **params)
+        if temperature is not None:
+            request["temperature"] = temperature
+
+        if not (self.enabled and use_cache):
+            return self.client.chat.completions.create(**request)
+
+        key = cache_key(model, messages, temperature, **params)
+        content = self._get(key)
+        if content is not None:
+            return _completion(content)
+
+        response = self.client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+        if content is not None:
+            self._put(key, content)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size of the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_enabled": self._db is not None
+            }
+
+    def clear(self) -> None:
+        """Drop every cached response from both tiers and reset the counters"""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
@@ -1,120 +1,45 @@
-from typing import Dict, List, Any
-import spacy
-from collections import Counter, defaultdict
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import re
 import os
-from openai import OpenAI
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from ..nlp_processing.analysis import TextAnalysis
+from ..registry import get_llm_client
+from .prompt_builder import CompactContext, build_outline_context, compact_topic_context
+from .style_profile import StyleProfile
+from ..metrics import span
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+# Shared, bounded pool for concurrent OpenAI calls across all outline requests
+llm_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('OUTLINE_MAX_CONCURRENCY', '8')),
+    thread_name_prefix='outline-llm'
+)
 
-# Initialize OpenAI client
-api_key = os.getenv('OPENAI_API_KEY')
-if not api_key:
-    raise ValueError("OPENAI_API_KEY not found in environment variables")
+def _submit(fn, *args, **kwargs) -> Future:
+    """Submit to the LLM pool, carrying the caller's context so timing spans reach its request"""
+    return llm_executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
 
-client = OpenAI(api_key=api_key)
+def _chat(stage: str, **request: Any) -> Any:
+    """OpenAI chat completion timed as `stage`"""
+    with span(stage):
+        return get_llm_client().chat.completions.create(**request)
 
-def extract_key_topics(text: str, text_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Extract and rank key topics from the text"""
-    # Use OpenAI to identify key topics
-    prompt = f"""
-    Analyze the following text and identify the 5 most important topics or themes.
-    For each topic, provide:
-    1. The topic name
-    2. Its importance score (1-10)
-    3. A relevant quote or context from the text
-
-    Text: {text}
-
-    Respond in a structured format that can be easily parsed.
-    """
-
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that analyzes text and identifies key topics."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.7
-    )
-
-    # Process the response to extract topics
-    topics = []
-    try:
-        content = response.choices[0].message.content
-        # Parse the content to extract topics (implementation depends on the response format)
-        # For now, we'll also use spaCy as a backup
-        doc = nlp(text)
-        
-        # Collect potential topics with their importance scores
-        topic_dict = defaultdict(lambda: {"score": 0, "context": set()})
-        
-        for chunk in doc.noun_chunks:
-            if not chunk.root.is_stop and len(chunk.text.split()) <= 3:
-                position_score = 1 - (chunk.start / len(doc))
-                topic_dict[chunk.text.lower()]["score"] += (1 + position_score)
-                topic_dict[chunk.text.lower()]["context"].add(chunk.sent.text)
-        
-        topics = [
-            {
-                "topic": topic,
-                "score": data["score"],
-                "context": list(data["context"])
-            }
-            for topic, data in topic_dict.items()
-        ]
-        topics.sort(key=lambda x: x["score"], reverse=True)
-        
-    except Exception as e:
-        print(f"Error processing OpenAI response: {e}")
-    
-    return topics[:5]
+def extract_key_topics(text: str, text_analysis: Dict[str, Any], analysis: Optional[TextAnalysis] = None) -> List[Dict[str, Any]]:
+    """Extract and rank key topics from the text using spaCy noun chunks from the shared parse"""
+    if analysis is None:
+        analysis = TextAnalysis(text, profile="topics")
+    with span("topic_extraction"):
+        return analysis.noun_chunk_topics(limit=5)
 
-def analyze_text_structure(text: str) -> Dict[str, Any]:
+def analyze_text_structure(text: str, analysis: Optional[TextAnalysis] = None) -> Dict[str, Any]:
     """Analyze the structure and flow of the text"""
-    doc = nlp(text)
-    
-    # Analyze paragraphs
-    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-    
-    # Analyze sentence types
-    sentence_types = {
-        "statements": 0,
-        "questions": 0,
-        "complex": 0  # sentences with multiple clauses
-    }
-    
-    transition_words = set([
-        "however", "therefore", "furthermore", "moreover",
-        "consequently", "meanwhile", "nevertheless", "although"
-    ])
-    
-    transitions = 0
-    
-    for sent in doc.sents:
-        # Count sentence types
-        if "?" in sent.text:
-            sentence_types["questions"] += 1
-        elif len([token for token in sent if token.dep_ == "mark"]) > 0:
-            sentence_types["complex"] += 1
-        else:
-            sentence_types["statements"] += 1
-            
-        # Count transition words
-        if any(word.lower() in transition_words for word in sent.text.split()):
-            transitions += 1
-    
-    return {
-        "num_paragraphs": len(paragraphs),
-        "avg_paragraph_length": sum(len(p.split()) for p in paragraphs) / len(paragraphs) if paragraphs else 0,
-        "sentence_types": sentence_types,
-        "transitions": transitions
-    }
+    if analysis is None:
+        analysis = TextAnalysis(text, profile="structure")
+    return analysis.structure()
 
 def generate_section_points(topic: Dict[str, Any], text_analysis: Dict[str, Any]) -> List[str]:
     """Generate specific points for a section based on the topic and its context"""
@@ -122,7 +47,7 @@ def generate_section_points(topic: Dict[str, Any], text_analysis: Dict[str, Any]
     Create 3-4 specific discussion points for the topic: {topic['topic']}
     
     Context from the text:
-    {' '.join(topic['context'])}
+    {compact_topic_context(topic).text}
     
     Generate points that:
     1. Are specific and actionable
@@ -133,7 +58,8 @@ def generate_section_points(topic: Dict[str, Any], text_analysis: Dict[str, Any]
     Format each point as a clear, complete sentence.
     """
 
-    response = client.chat.completions.create(
+    response = _chat(
+        "openai_section_points",
         model="gpt-3.5-turbo",
         messages=[
             {"role": "system", "content": "You are a helpful assistant that creates detailed outline points."},
@@ -149,23 +75,69 @@ def generate_section_points(topic: Dict[str, Any], text_analysis: Dict[str, Any]
         return points[:3]  # Return top 3 points
     except Exception as e:
         print(f"Error generating section points: {e}")
-        return [
-            f"Analyze the key aspects of {topic['topic']}",
-            f"Discuss the significance of {topic['topic']}",
-            f"Provide examples related to {topic['topic']}"
-        ]
+        return default_section_points(topic)
+
+def default_section_points(topic: Dict[str, Any]) -> List[str]:
+    """Generic points used when the AI points for a topic are unavailable"""
+    return [
+        f"Analyze the key aspects of {topic['topic']}",
+        f"Discuss the significance of {topic['topic']}",
+        f"Provide examples related to {topic['topic']}"
+    ]
+
+def _collect_section_points(future: Future, topic: Dict[str, Any]) -> List[str]:
+    """Wait for a section points call, falling back to generic points if it failed"""
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"Error generating section points for {topic['topic']}: {e}")
+        return default_section_points(topic)
+
+def _profile_notes(style_profile: Optional[StyleProfile]) -> str:
+    """Prompt lines describing the author's usual style, empty without a profile"""
+    if style_profile is None or not style_profile.documents:
+        return ""
+    return f"""
+    Author's usual style across {style_profile.documents} earlier documents:
+    - Average sentence length: {style_profile.sentence_length_mean:.1f} words (std {style_profile.sentence_length_std:.1f})
+    - Preferred tense: {style_profile.preferred_tense() or "unknown"}
+"""
+
+def _example_notes(style_examples: Optional[List[Dict[str, Any]]]) -> str:
+    """Prompt lines describing the reference corpus posts, empty without examples"""
+    features = [example["features"] for example in style_examples or []]
+    if not features:
+        return ""
+    def mean(name: str) -> float:
+        return sum(f.get(name, 0.0) for f in features) / len(features)
+    tense = max(("Past", "Pres"), key=lambda t: mean(f"tense_{t}"))
+    return f"""
+    Reference posts written in a similar style ({len(features)} examples):
+    - Average sentence length: {mean("avg_sentence_length"):.1f} words
+    - Average word length: {mean("avg_word_length"):.1f} characters
+    - Predominant tense: {("Present" if tense == "Pres" else "Past") if mean(f"tense_{tense}") else "unknown"}
+"""
+
+def _start_outline(text: str, text_analysis: Dict[str, Any], style_analysis: Dict[str, Any],
+                   analysis: Optional[TextAnalysis],
+                   style_profile: Optional[StyleProfile] = None,
+                   style_examples: Optional[List[Dict[str, Any]]] = None
+                   ) -> Tuple[List[Dict[str, Any]], CompactContext, Future, List[Future]]:
+    """Extract topics and submit the outline and section points calls without waiting for them"""
+    if analysis is None:
+        analysis = TextAnalysis(text, profile="topics")
 
-def generate_outline(text: str, text_analysis: Dict[str, Any], style_analysis: Dict[str, Any], style_examples: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """
-    Generate a structured outline based on text analysis and AI assistance.
-    """
     # Extract key topics
-    topics = extract_key_topics(text, text_analysis)
-    
+    topics = extract_key_topics(text, text_analysis, analysis)
+
+    # Condense long input to its key sentences so the prompt stays within budget
+    with span("prompt_building"):
+        context = build_outline_context(text, analysis, topics)
+
     # Create the main outline prompt
     outline_prompt = f"""
     Create a detailed document outline based on this text:
-    {text}
+    {context.text}
 
     Key topics identified:
     {', '.join(t['topic'] for t in topics)}
@@ -173,7 +145,7 @@ def generate_outline(text: str, text_analysis: Dict[str, Any], style_analysis: D
     Writing style analysis:
     - Average sentence length: {style_analysis["style_metrics"]["avg_sentence_length"]} words
     - Preferred tense: {style_analysis["style_metrics"]["verb_tenses"]}
-
+    {_profile_notes(style_profile)}{_example_notes(style_examples)}
     Include:
     1. An introduction section
     2. Main body sections for each key topic
@@ -184,7 +156,11 @@ def generate_outline(text: str, text_analysis: Dict[str, Any], style_analysis: D
     Format the response as a structured outline with clear sections and points.
     """
 
-    response = client.chat.completions.create(
+    # Fan out the outline call and every section points call concurrently, so the
+    # whole outline costs roughly one LLM round trip instead of one per call
+    outline_future = _submit(
+        _chat,
+        "openai_outline",
         model="gpt-3.5-turbo",
         messages=[
             {"role": "system", "content": "You are a helpful assistant that creates detailed document outlines."},
@@ -192,43 +168,71 @@ def generate_outline(text: str, text_analysis: Dict[str, Any], style_analysis: D
         ],
         temperature=0.7
     )
+    point_futures = [_submit(generate_section_points, topic, text_analysis) for topic in topics]
+    return topics, context, outline_future, point_futures
+
+def _introduction_section(topics: List[Dict[str, Any]], text_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": "Introduction",
+        "key_points": [
+            "Set context and background",
+            f"Introduce main topics: {', '.join(t['topic'] for t in topics[:3])}",
+            "State the purpose or thesis"
+        ],
+        "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.15)
+    }
 
+def _topic_section(topic: Dict[str, Any], points: List[str], text_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": topic["topic"].title(),
+        "key_points": points,
+        "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.15)
+    }
+
+def _conclusion_section(text_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": "Conclusion",
+        "key_points": [
+            "Summarize key findings",
+            "Synthesize main arguments",
+            "Provide final thoughts or recommendations"
+        ],
+        "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.1)
+    }
+
+def _assemble_outline(topics: List[Dict[str, Any]], section_points: List[List[str]], outline_future: Future,
+                      text_analysis: Dict[str, Any], style_analysis: Dict[str, Any],
+                      style_profile: Optional[StyleProfile], context: CompactContext) -> Dict[str, Any]:
+    """Build the final outline, falling back to the basic structure if the outline call failed"""
+    outline = _build_outline(topics, section_points, outline_future, text_analysis, style_analysis)
+    # Size of the outline prompt's text context before and after condensing it
+    outline["prompt_tokens"] = {"original": context.tokens_before, "compacted": context.tokens_after}
+    if style_profile is not None and style_profile.documents:
+        # The author's habits across earlier documents outweigh those of a short new text
+        profile_tense = style_profile.preferred_tense()
+        if profile_tense:
+            outline["writing_style"]["recommended_tense"] = profile_tense
+        outline["writing_style"]["author_profile"] = style_profile.summary()
+    return outline
+
+def _build_outline(topics: List[Dict[str, Any]], section_points: List[List[str]], outline_future: Future,
+                   text_analysis: Dict[str, Any], style_analysis: Dict[str, Any]) -> Dict[str, Any]:
     try:
         # Process the AI-generated outline
-        content = response.choices[0].message.content
+        content = outline_future.result().choices[0].message.content
         
         # Create sections array
         sections = []
         
         # Add introduction
-        sections.append({
-            "title": "Introduction",
-            "key_points": [
-                "Set context and background",
-                f"Introduce main topics: {', '.join(t['topic'] for t in topics[:3])}",
-                "State the purpose or thesis"
-            ],
-            "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.15)
-        })
+        sections.append(_introduction_section(topics, text_analysis))
         
         # Add main body sections
-        for topic in topics:
-            sections.append({
-                "title": topic["topic"].title(),
-                "key_points": generate_section_points(topic, text_analysis),
-                "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.15)
-            })
+        for topic, points in zip(topics, section_points):
+            sections.append(_topic_section(topic, points, text_analysis))
         
         # Add conclusion
-        sections.append({
-            "title": "Conclusion",
-            "key_points": [
-                "Summarize key findings",
-                "Synthesize main arguments",
-                "Provide final thoughts or recommendations"
-            ],
-            "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.1)
-        })
+        sections.append(_conclusion_section(text_analysis))
 
         return {
             "title": "Document Outline",
@@ -251,11 +255,7 @@ def generate_outline(text: str, text_analysis: Dict[str, Any], style_analysis: D
                     "key_points": ["Set context", "Introduce topic", "State purpose"],
                     "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.15)
                 },
-                *[{
-                    "title": topic["topic"].title(),
-                    "key_points": generate_section_points(topic, text_analysis),
-                    "suggested_length": int(text_analysis["statistics"]["word_count"] * 0.15)
-                } for topic in topics],
+                *[_topic_section(topic, points, text_analysis) for topic, points in zip(topics, section_points)],
                 {
                     "title": "Conclusion",
                     "key_points": ["Summarize findings", "Final thoughts", "Future implications"],
@@ -266,4 +266,51 @@ def generate_outline(text: str, text_analysis: Dict[str, Any], style_analysis: D
                 "sentence_length": style_analysis["style_metrics"]["avg_sentence_length"],
                 "recommended_tense": "Present"
             }
-        } 
\ No newline at end of file
+        }
+
+def generate_outline(text: str, text_analysis: Dict[str, Any], style_analysis: Dict[str, Any], style_examples: List[Dict[str, Any]],
+                     analysis: Optional[TextAnalysis] = None, style_profile: Optional[StyleProfile] = None) -> Dict[str, Any]:
+    """
+    Generate a structured outline based on text analysis and AI assistance.
+
+    Pass the `TextAnalysis` used to build `text_analysis` and `style_analysis`
+    so topic extraction reuses its parse instead of running spaCy again, and
+    the author's `StyleProfile`, if known, to tailor the style recommendations.
+    `style_examples` are {"row", "distance", "features"} dicts of reference
+    corpus posts whose style summary is added to the prompt.
+    """
+    topics, context, outline_future, point_futures = _start_outline(text, text_analysis, style_analysis, analysis,
+                                                                    style_profile, style_examples)
+
+    # Section points are shared by the regular and the fallback outline
+    section_points = [_collect_section_points(future, topic) for future, topic in zip(point_futures, topics)]
+
+    return _assemble_outline(topics, section_points, outline_future, text_analysis, style_analysis,
+                             style_profile, context)
+
+def iter_outline(text: str, text_analysis: Dict[str, Any], style_analysis: Dict[str, Any], style_examples: List[Dict[str, Any]],
+                 analysis: Optional[TextAnalysis] = None, style_profile: Optional[StyleProfile] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Generate an outline incrementally, yielding each section as soon as it is ready.
+
+    Yields `{"event": "section", "index": i, "section": {...}}` events, where
+    `index` is the section's position in the final outline; topic sections
+    arrive in completion order. The last event is `{"event": "outline",
+    "outline": {...}}` carrying the same outline `generate_outline` returns.
+    """
+    topics, context, outline_future, point_futures = _start_outline(text, text_analysis, style_analysis, analysis,
+                                                                    style_profile, style_examples)
+
+    yield {"event": "section", "index": 0, "section": _introduction_section(topics, text_analysis)}
+
+    section_points: List[Optional[List[str]]] = [None] * len(topics)
+    positions = {future: i for i, future in enumerate(point_futures)}
+    for future in as_completed(point_futures):
+        i = positions[future]
+        section_points[i] = _collect_section_points(future, topics[i])
+        yield {"event": "section", "index": i + 1, "section": _topic_section(topics[i], section_points[i], text_analysis)}
+
+    yield {"event": "section", "index": len(topics) + 1, "section": _conclusion_section(text_analysis)}
+
+    yield {"event": "outline", "outline": _assemble_outline(topics, section_points, outline_future, text_analysis,
+                                                            style_analysis, style_profile, context)}
@@ -0,0 +1,189 @@
+"""
+Condensed text context for the outline prompts.
+
+Instead of pasting the whole input into every prompt, the outline prompt gets
+the sentences that best cover the extracted topics and named entities, within
+a token budget, and each section prompt gets as much of its topic's context as
+fits its own budget. Everything comes from the existing spaCy analysis; no
+extra model calls are made. Tokens are counted with tiktoken, whose encoding
+is read from TIKTOKEN_CACHE_DIR (run this module to fill it), and by a
+word/punctuation approximation when the encoding is unavailable.
+"""
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple
+from ..nlp_processing.analysis import TextAnalysis
+from ..metrics import PROMPT_TOKENS
+from ..settings import PROMPT_TOKEN_BUDGET, SECTION_CONTEXT_TOKENS, TIKTOKEN_CACHE_DIR
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+# Roughly one BPE token per word or punctuation mark
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str) -> Any:
+    # Read by tiktoken when an encoding is first loaded; files missing there are downloaded
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", TIKTOKEN_CACHE_DIR)
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Error loading tiktoken encoding, approximating token counts: {e}")
+        return None
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """
+    Number of prompt tokens in `text` for `model`.
+    
+    Args:
+        text (str): Text to count
+        model (str): OpenAI model name, selects the tiktoken encoding
+        
+    Returns:
+        int: Exact count with tiktoken, otherwise an approximation
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(_TOKEN_PATTERN.findall(text))
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class CompactContext(NamedTuple):
+    """Prompt context and its token counts before and after compaction"""
+    text: str
+    tokens_before: int
+    tokens_after: int
+
+
+def _record(prompt: str, before: int, after: int) -> None:
+    PROMPT_TOKENS.inc(before, prompt=prompt, stage="original")
+    PROMPT_TOKENS.inc(after, prompt=prompt, stage="compacted")
+
+def key_sentences(analysis: TextAnalysis, topics: List[Dict[str, Any]], budget: int,
+                  model: str = DEFAULT_MODEL) -> List[str]:
+    """
+    Sentences that best cover the topics and entities, within a token budget.
+
+    Sentences are ranked by how many topics they mention (weighted double),
+    how many entities they contain and whether they open or close the text,
+    then returned in document order.
+    
+    Args:
+        analysis (TextAnalysis): Analysis of the text
+        topics (List[Dict]): Topics from `extract_key_topics`
+        budget (int): Maximum total tokens of the selected sentences
+        model (str): Model whose tokenizer counts tokens
+        
+    Returns:
+        List of sentence texts
+    """
+    sentences = list(analysis.doc.sents)
+    if not sentences:
+        return []
+    terms = [topic["topic"] for topic in topics]
+    entities_per_sentence = Counter(ent.sent.start for ent in analysis.doc.ents)
+
+    def score(i: int) -> float:
+        sentence = sentences[i]
+        lowered = sentence.text.lower()
+        position = 1 if i == 0 or i == len(sentences) - 1 else 0
+        return 2 * sum(1 for term in terms if term in lowered) + entities_per_sentence[sentence.start] + position
+
+    selected = []
+    used = 0
+    for i in sorted(range(len(sentences)), key=lambda i: (-score(i), i)):
+        tokens = count_tokens(sentences[i].text, model)
+        if used + tokens > budget:
+            continue
+        selected.append(i)
+        used += tokens
+    return [sentences[i].text.strip() for i in sorted(selected)]
+
+def build_outline_context(text: str, analysis: TextAnalysis, topics: List[Dict[str, Any]],
+                          budget: int = PROMPT_TOKEN_BUDGET, model: str = DEFAULT_MODEL) -> CompactContext:
+    """
+    Text for the outline prompt: the input itself if it fits the budget,
+    otherwise its key sentences plus the most frequent named entities.
+    
+    Args:
+        text (str): Full input text
+        analysis (TextAnalysis): Analysis of `text`
+        topics (List[Dict]): Topics from `extract_key_topics`
+        budget (int): Token budget, 0 to always use the full text
+        model (str): Model whose tokenizer counts tokens
+        
+    Returns:
+        CompactContext
+    """
+    before = count_tokens(text, model)
+    if budget <= 0 or before <= budget:
+        _record("outline", before, before)
+        return CompactContext(text, before, before)
+
+    entity_counts = Counter(ent.text for ent in analysis.doc.ents)
+    entity_line = ""
+    if entity_counts:
+        entity_line = "Named entities: " + ", ".join(entity for entity, _ in entity_counts.most_common(10))
+
+    sentences = key_sentences(analysis, topics, max(0, budget - count_tokens(entity_line, model)), model)
+    compact = " ".join(sentences)
+    if entity_line:
+        compact = f"{compact}\n{entity_line}" if compact else entity_line
+    after = count_tokens(compact, model)
+    _record("outline", before, after)
+    return CompactContext(compact, before, after)
+
+def compact_topic_context(topic: Dict[str, Any], budget: int = SECTION_CONTEXT_TOKENS,
+                          model: str = DEFAULT_MODEL) -> CompactContext:
+    """
+    Context sentences of a topic for its section prompt, within a token budget.
+    
+    Args:
+        topic (Dict): Topic from `extract_key_topics`
+        budget (int): Token budget, 0 to keep every context sentence
+        model (str): Model whose tokenizer counts tokens
+        
+    Returns:
+        CompactContext
+    """
+    full = ' '.join(topic['context'])
+    before = count_tokens(full, model)
+    if budget <= 0 or before <= budget:
+        _record("section_points", before, before)
+        return CompactContext(full, before, before)
+
+    # Shortest sentences first, so more of the topic's mentions fit
+    by_length = sorted(topic['context'], key=len)
+    selected: List[str] = []
+    used = 0
+    for sentence in by_length:
+        tokens = count_tokens(sentence, model)
+        if used + tokens > budget:
+            break
+        selected.append(sentence)
+        used += tokens
+    if not selected:
+        # Even the shortest sentence is over budget: keep its first words
+        words = by_length[0].split()
+        selected = [" ".join(words[:max(1, budget * 3 // 4)])]
+
+    compact = ' '.join(selected)
+    after = count_tokens(compact, model)
+    _record("section_points", before, after)
+    return CompactContext(compact, before, after)
+
+if __name__ == "__main__":
+    # Download the encoding into TIKTOKEN_CACHE_DIR ahead of time, e.g. during deployment
+    if _get_encoding(DEFAULT_MODEL) is None:
+        raise SystemExit(f"Could not cache the tiktoken encoding for {DEFAULT_MODEL}")
+    print(f"Cached the tiktoken encoding for {DEFAULT_MODEL} in {os.environ['TIKTOKEN_CACHE_DIR']}")
@@ -0,0 +1,240 @@
+"""
+Vectorised style-similarity index over the blog corpus.
+
+Each post is reduced to a fixed-length style vector (sentence and word length,
+tense distribution, punctuation rates and POS distribution). The vectors are
+standardised and stored as a NumPy matrix, so finding the posts closest to a
+user's measured style is a single matrix-vector product.
+
+Build the index offline (from the backend directory):
+    python -m src.models.style_index --max-docs 100000 --n-process 4
+"""
+import argparse
+import json
+import os
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import numpy as np
+from ..settings import CACHE_DIR
+
+# Bump when the feature layout changes
+STYLE_INDEX_VERSION = 1
+
+DEFAULT_INDEX_DIR = os.path.join(CACHE_DIR, "style_index")
+
+TENSES = ("Past", "Pres", "None")
+PUNCTUATION = (".", ",", "!", "?", ";", ":", "-", "\"", "'", "(")
+POS_TAGS = ("ADJ", "ADP", "ADV", "AUX", "CCONJ", "DET", "INTJ", "NOUN", "NUM",
+            "PART", "PRON", "PROPN", "PUNCT", "SCONJ", "SPACE", "SYM", "VERB", "X")
+
+FEATURE_NAMES = (
+    ["avg_sentence_length", "avg_word_length"]
+    + [f"tense_{tense}" for tense in TENSES]
+    + [f"punct_{mark}" for mark in PUNCTUATION]
+    + [f"pos_{tag}" for tag in POS_TAGS]
+)
+
+
+def style_vector(text_analysis: Dict[str, Any], style_analysis: Dict[str, Any]) -> np.ndarray:
+    """
+    Style feature vector of one text.
+    
+    Args:
+        text_analysis (Dict): Result of `preprocess_text`
+        style_analysis (Dict): Result of `analyze_writing_style`
+        
+    Returns:
+        float32 array laid out as FEATURE_NAMES
+    """
+    statistics = text_analysis["statistics"]
+    style = style_analysis["style_metrics"]
+
+    verbs = sum(style["verb_tenses"].values())
+    words = statistics["word_count"]
+    tokens = sum(statistics["pos_distribution"].values())
+
+    features = [style["avg_sentence_length"], statistics["avg_word_length"]]
+    features += [style["verb_tenses"].get(tense, 0) / verbs if verbs else 0.0 for tense in TENSES]
+    # Punctuation per word, so long and short posts are comparable
+    features += [style["punctuation_usage"].get(mark, 0) / words if words else 0.0 for mark in PUNCTUATION]
+    features += [statistics["pos_distribution"].get(tag, 0) / tokens if tokens else 0.0 for tag in POS_TAGS]
+    return np.asarray(features, dtype=np.float32)
+
+def style_features(text_analysis: Dict[str, Any], style_analysis: Dict[str, Any]) -> Dict[str, float]:
+    """`style_vector` of one text keyed by FEATURE_NAMES, in the shape `nearest_examples` reports"""
+    return {name: round(float(value), 4) for name, value in zip(FEATURE_NAMES, style_vector(text_analysis, style_analysis))}
+
+
+class StyleIndex:
+    """
+    Nearest-neighbour index of corpus posts by writing style.
+
+    Stores the standardised feature matrix, the squared norm of every row and
+    the corpus row id of every vector. Matrices are memory-mapped on load.
+    """
+
+    def __init__(self, features: np.ndarray, rows: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                 norms: Optional[np.ndarray] = None, meta: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            features (np.ndarray): Standardised (n_posts, n_features) float32 matrix
+            rows (np.ndarray): Corpus row id of each feature row
+            mean (np.ndarray): Per-feature mean used for standardisation
+            std (np.ndarray): Per-feature standard deviation used for standardisation
+            norms (np.ndarray, optional): Squared L2 norm of each feature row
+            meta (Dict, optional): Build metadata (dataset, split, version)
+        """
+        self.features = features
+        self.rows = rows
+        self.mean = mean
+        self.std = std
+        self.norms = norms if norms is not None else np.einsum('ij,ij->i', features, features)
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def from_vectors(cls, vectors: np.ndarray, rows: np.ndarray, meta: Optional[Dict[str, Any]] = None) -> "StyleIndex":
+        """Standardise raw style vectors and build the index"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        mean = vectors.mean(axis=0)
+        std = vectors.std(axis=0)
+        # Constant features carry no information; avoid dividing by zero
+        std[std == 0] = 1.0
+        features = ((vectors - mean) / std).astype(np.float32)
+        return cls(features, np.asarray(rows, dtype=np.int64), mean, std, meta=meta)
+
+    def _standardise(self, vector: np.ndarray) -> np.ndarray:
+        return ((np.asarray(vector, dtype=np.float32) - self.mean) / self.std).astype(np.float32)
+
+    def _nearest(self, vector: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """(index position, distance) of the k nearest rows, closest first"""
+        if not len(self):
+            return []
+        q = self._standardise(vector)
+        # |x - q|^2 = |x|^2 - 2 x.q + |q|^2, one matrix-vector product for all rows
+        distances = self.norms - 2.0 * (self.features @ q) + float(q @ q)
+        k = min(k, len(distances))
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest])]
+        return [(int(i), float(np.sqrt(max(distances[i], 0.0)))) for i in nearest]
+
+    def query(self, vector: np.ndarray, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Find the k posts whose style is closest to `vector`.
+        
+        Args:
+            vector (np.ndarray): Raw style vector from `style_vector`
+            k (int): Number of neighbours
+            
+        Returns:
+            List of (corpus row id, euclidean distance) pairs, closest first
+        """
+        return [(int(self.rows[i]), distance) for i, distance in self._nearest(vector, k)]
+
+    def features_of(self, position: int) -> Dict[str, float]:
+        """Raw (unstandardised) features of the index row at `position`"""
+        raw = self.features[position] * self.std + self.mean
+        return {name: round(float(value), 4) for name, value in zip(FEATURE_NAMES, raw)}
+
+    def nearest_examples(self, text_analysis: Dict[str, Any], style_analysis: Dict[str, Any],
+                         k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Corpus posts closest to the style of an analysed text.
+        
+        Args:
+            text_analysis (Dict): Result of `preprocess_text`
+            style_analysis (Dict): Result of `analyze_writing_style`
+            k (int): Number of examples
+            
+        Returns:
+            List of dicts with the corpus row id, distance and style features of each post
+        """
+        return [
+            {"row": int(self.rows[i]), "distance": round(distance, 4), "features": self.features_of(i)}
+            for i, distance in self._nearest(style_vector(text_analysis, style_analysis), k)
+        ]
+
+    def save(self, directory: str = DEFAULT_INDEX_DIR) -> None:
+        """Write the index as .npy files plus a metadata JSON"""
+        os.makedirs(directory, exist_ok=True)
+        for name in ("features", "rows", "mean", "std", "norms"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        meta = {**self.meta, "version": STYLE_INDEX_VERSION, "feature_names": FEATURE_NAMES, "size": len(self)}
+        with open(os.path.join(directory, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_INDEX_DIR) -> Optional["StyleIndex"]:
+        """
+        Load a saved index, memory-mapping its matrices.
+        
+        Returns:
+            The index, or None if it is missing or was built with another feature layout
+        """
+        try:
+            with open(os.path.join(directory, "meta.json"), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        if meta.get("version") != STYLE_INDEX_VERSION or meta.get("feature_names") != FEATURE_NAMES:
+            print("Ignoring style index built with a different feature layout")
+            return None
+
+        def array(name: str) -> np.ndarray:
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+
+        return cls(array("features"), array("rows"), np.load(os.path.join(directory, "mean.npy")),
+                   np.load(os.path.join(directory, "std.npy")), norms=array("norms"), meta=meta)
+
+def _iter_corpus_texts(loader: Any, split: str, batch_size: int = 1000) -> Iterator[str]:
+    for batch in loader.dataset[split].iter(batch_size=batch_size):
+        yield from batch['text']
+
+def build_style_index(loader: Any, split: str = 'train', max_docs: Optional[int] = None,
+                      batch_size: int = 64, n_process: int = 1) -> StyleIndex:
+    """
+    Analyse corpus posts with batched spaCy and build a StyleIndex over them.
+    
+    Args:
+        loader (BlogDatasetLoader): Loader with the corpus loaded
+        split (str): Dataset split to index
+        max_docs (int, optional): Index only the first max_docs posts
+        batch_size (int): Number of texts spaCy parses per batch
+        n_process (int): Number of worker processes used by `nlp.pipe`
+        
+    Returns:
+        StyleIndex over the analysed posts (corpus row ids 0..n-1)
+    """
+    from ..nlp_processing.preprocess import iter_process_texts
+
+    total = len(loader.dataset[split]) if max_docs is None else min(max_docs, len(loader.dataset[split]))
+    vectors = np.empty((total, len(FEATURE_NAMES)), dtype=np.float32)
+    texts = islice(_iter_corpus_texts(loader, split), total)
+    count = 0
+    # The vectors need no lemmas or entities, so the lemmatizer and NER are left out
+    results = iter_process_texts(texts, batch_size=batch_size, n_process=n_process,
+                                 fields=("statistics", "style_metrics"))
+    for count, result in enumerate(results, start=1):
+        vectors[count - 1] = style_vector(result, result)
+        if count % 10000 == 0:
+            print(f"Indexed {count}/{total} posts")
+
+    meta = {"dataset": loader.dataset_name, "split": split}
+    return StyleIndex.from_vectors(vectors[:count], np.arange(count), meta=meta)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the style-similarity index over the blog corpus")
+    parser.add_argument("--split", default="train")
+    parser.add_argument("--max-docs", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--output", default=DEFAULT_INDEX_DIR)
+    args = parser.parse_args()
+
+    from ..registry import get_blog_dataset
+    index = build_style_index(get_blog_dataset(), split=args.split, max_docs=args.max_docs,
+                              batch_size=args.batch_size, n_process=args.n_process)
+    index.save(args.output)
+    print(f"Saved style index with {len(index)} posts to {args.output}")
@@ -0,0 +1,148 @@
+"""
+Per-user writing style profile built from mergeable running statistics.
+
+A profile holds the number of documents, words and sentences, the mean and
+variance of sentence length (as a count/mean/M2 triple) and tense and
+punctuation counts. Profiles merge in O(1) plus the size of their count
+tables, so adding a document costs only as much as that document's metrics
+and no earlier document is ever reprocessed.
+"""
+import math
+from collections import Counter
+from typing import Any, Dict, Optional
+from ..nlp_processing.partial import PartialAnalysis
+
+
+class StyleProfile:
+    """Running style statistics of one author"""
+
+    __slots__ = ("documents", "words", "sentences", "sentence_length_mean", "sentence_length_m2",
+                 "verb_tenses", "punctuation")
+
+    def __init__(self):
+        self.documents = 0
+        self.words = 0
+        self.sentences = 0
+        self.sentence_length_mean = 0.0
+        # Sum of squared deviations from the mean (Welford), merged with Chan's formula
+        self.sentence_length_m2 = 0.0
+        self.verb_tenses: Counter = Counter()
+        self.punctuation: Counter = Counter()
+
+    @classmethod
+    def from_counts(cls, words: int, sentence_lengths: Dict[int, int], verb_tenses: Dict[str, int],
+                    punctuation: Dict[str, int]) -> "StyleProfile":
+        """
+        Profile of one document, with the exact sentence length variance.
+        
+        Args:
+            words (int): Word count
+            sentence_lengths (Dict[int, int]): Sentence length (in non-punctuation tokens) -> number of sentences
+            verb_tenses (Dict[str, int]): Verb tense counts
+            punctuation (Dict[str, int]): Punctuation mark counts
+            
+        Returns:
+            StyleProfile of the document
+        """
+        profile = cls()
+        profile.documents = 1
+        profile.words = words
+        count = sum(sentence_lengths.values())
+        if count:
+            mean = sum(length * n for length, n in sentence_lengths.items()) / count
+            profile.sentences = count
+            profile.sentence_length_mean = mean
+            profile.sentence_length_m2 = sum(n * (length - mean) ** 2 for length, n in sentence_lengths.items())
+        profile.verb_tenses.update(verb_tenses)
+        profile.punctuation.update(punctuation)
+        return profile
+
+    @classmethod
+    def from_partial(cls, partial: PartialAnalysis) -> "StyleProfile":
+        """
+        Profile of one document from its analysis aggregates.
+        
+        Args:
+            partial (PartialAnalysis): Aggregates computed with the statistics and style fields
+            
+        Returns:
+            StyleProfile of the document
+        """
+        return cls.from_counts(partial.word_count, partial.sentence_lengths, partial.verb_tenses, partial.punctuation)
+
+    def merge(self, other: "StyleProfile") -> "StyleProfile":
+        """
+        Fold another profile into this one, in place.
+        
+        Args:
+            other (StyleProfile): Profile of other documents by the same author
+            
+        Returns:
+            self
+        """
+        total = self.sentences + other.sentences
+        if total:
+            delta = other.sentence_length_mean - self.sentence_length_mean
+            self.sentence_length_mean += delta * other.sentences / total
+            self.sentence_length_m2 += other.sentence_length_m2 + delta * delta * self.sentences * other.sentences / total
+        self.sentences = total
+        self.documents += other.documents
+        self.words += other.words
+        self.verb_tenses.update(other.verb_tenses)
+        self.punctuation.update(other.punctuation)
+        return self
+
+    @property
+    def sentence_length_std(self) -> float:
+        return math.sqrt(self.sentence_length_m2 / self.sentences) if self.sentences else 0.0
+
+    def preferred_tense(self) -> Optional[str]:
+        """Most frequent verb tense, ignoring untensed verbs"""
+        tenses = [(tense, count) for tense, count in self.verb_tenses.items() if tense != "None"]
+        return max(tenses, key=lambda item: item[1])[0] if tenses else None
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Readable profile for API responses and prompts.
+
+        Returns:
+            Dict with sentence length statistics and tense/punctuation distributions
+        """
+        def distribution(counts: Counter) -> Dict[str, float]:
+            total = sum(counts.values())
+            return {key: round(count / total, 3) for key, count in counts.most_common()} if total else {}
+
+        return {
+            "documents": self.documents,
+            "words": self.words,
+            "sentences": self.sentences,
+            "avg_sentence_length": round(self.sentence_length_mean, 2),
+            "sentence_length_std": round(self.sentence_length_std, 2),
+            "preferred_tense": self.preferred_tense(),
+            "verb_tenses": distribution(self.verb_tenses),
+            "punctuation_usage": distribution(self.punctuation)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable running statistics, the inverse of `from_dict`"""
+        return {
+            "documents": self.documents,
+            "words": self.words,
+            "sentences": self.sentences,
+            "sentence_length_mean": self.sentence_length_mean,
+            "sentence_length_m2": self.sentence_length_m2,
+            "verb_tenses": dict(self.verb_tenses),
+            "punctuation": dict(self.punctuation)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StyleProfile":
+        profile = cls()
+        profile.documents = data["documents"]
+        profile.words = data["words"]
+        profile.sentences = data["sentences"]
+        profile.sentence_length_mean = data["sentence_length_mean"]
+        profile.sentence_length_m2 = data["sentence_length_m2"]
+        profile.verb_tenses.update(data["verb_tenses"])
+        profile.punctuation.update(data["punctuation"])
+        return profile
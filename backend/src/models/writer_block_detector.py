@@ -1,11 +1,214 @@
 import time
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, Optional
+from ..settings import WRITER_BLOCK_PAUSE, WRITER_BLOCK_SESSION_TTL, WRITER_BLOCK_MAX_SESSIONS
+
+# Shortest gap used for typing rates, well below human inter-keystroke intervals
+_MIN_GAP = 0.02
 
 def detect_writer_block(text, last_typing_time=0):
     """
     Simulates writer's block detection by checking if the user has paused.
-    In a real app, this function would track keystrokes in real-time.
+    Use `WriterBlockDetector` to detect it from the editor's keystroke events.
     """
     current_time = time.time()
     if current_time - last_typing_time > 5:  # If paused for 5+ seconds
         return True
     return False
+
+
+class SessionState:
+    """Rolling typing statistics of one editor session, updated in O(1) per event"""
+
+    __slots__ = ("last_event", "gaps", "gap_sum", "rate_ewma", "chars", "active_time", "events")
+
+    def __init__(self, timestamp: float, window: int):
+        self.last_event = timestamp
+        # Ring buffer of recent inter-event gaps (capped at the pause threshold) and their sum
+        self.gaps: deque = deque(maxlen=window)
+        self.gap_sum = 0.0
+        # Exponentially weighted typing rate, in characters per second
+        self.rate_ewma = 0.0
+        self.chars = 0
+        # Typing time excluding long pauses, for the session's average rate
+        self.active_time = 0.0
+        self.events = 0
+
+
+class WriterBlockDetector:
+    """
+    Writer's block detection from a stream of keystroke / edit events.
+
+    Each session keeps a fixed-size ring buffer of inter-event gaps and an
+    EWMA of its typing rate. A session is considered blocked when it has been
+    idle for much longer than its own typical gap (and at least `pause_threshold`),
+    or when its recent typing rate has dropped far below its average. Sessions
+    idle for longer than `session_ttl` are evicted; all state is guarded by a
+    single lock, as every operation is O(1) (eviction is amortised).
+    """
+
+    def __init__(self, pause_threshold: float = WRITER_BLOCK_PAUSE, session_ttl: float = WRITER_BLOCK_SESSION_TTL,
+                 max_sessions: int = WRITER_BLOCK_MAX_SESSIONS, window: int = 64, alpha: float = 0.2,
+                 pause_factor: float = 4.0, slowdown_ratio: float = 0.25, min_events: int = 20):
+        """
+        Args:
+            pause_threshold (float): Shortest idle time, in seconds, reported as a block
+            session_ttl (float): Seconds of inactivity after which a session is dropped
+            max_sessions (int): Sessions kept at most; the least recently active are dropped first
+            window (int): Number of recent gaps kept per session
+            alpha (float): Weight of the newest event in the typing-rate EWMA
+            pause_factor (float): Idle time, as a multiple of the typical gap, reported as a block
+            slowdown_ratio (float): Recent/average typing rate below which the session is slowing down
+            min_events (int): Events needed before the typing rate is trusted
+        """
+        self.pause_threshold = pause_threshold
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.window = window
+        self.alpha = alpha
+        self.pause_factor = pause_factor
+        self.slowdown_ratio = slowdown_ratio
+        self.min_events = min_events
+        self.evicted = 0
+        # Ordered by last activity, least recent first
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, chars: int = 1, now: Optional[float] = None) -> None:
+        """
+        Record one keystroke or edit event, received now.
+        
+        Args:
+            session_id (str): Editor session
+            chars (int): Characters typed (or changed) by the event
+            now (float, optional): Server time the event was received, defaults to the current time
+        """
+        self.record_events(session_id, [{"chars": chars}], now)
+
+    def record_events(self, session_id: str, events: Iterable[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """
+        Record a batch of events of the form {"timestamp": float, "chars": int}, both optional.
+
+        Sessions are timed by the server clock: the batch is taken as received
+        at `now`, and client timestamps (seconds) only space out the events
+        within it, the latest one landing at `now`. A skewed or malformed client
+        clock therefore never shifts idle times or evicts other sessions.
+        
+        Args:
+            session_id (str): Editor session
+            events (Iterable[Dict]): Events in the order they happened
+            now (float, optional): Server time the batch was received, defaults to the current time
+            
+        Returns:
+            int: Number of events recorded
+        
+        Raises:
+            ValueError: For negative `chars`; no event of the batch is recorded then
+        """
+        received = time.time() if now is None else now
+        parsed = []
+        for event in events:
+            chars = int(event.get("chars", 1))
+            if chars < 0:
+                raise ValueError(f"chars must not be negative, got {chars}")
+            timestamp = event.get("timestamp")
+            parsed.append((chars, None if timestamp is None else float(timestamp)))
+        if not parsed:
+            return 0
+        stamps = [timestamp for _, timestamp in parsed if timestamp is not None]
+        latest = max(stamps) if stamps else 0.0
+
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is not None:
+                self._sessions.move_to_end(session_id)
+            for chars, timestamp in parsed:
+                at = received if timestamp is None else received - (latest - timestamp)
+                if state is None:
+                    state = self._sessions[session_id] = SessionState(at, self.window)
+                else:
+                    self._add_gap(state, chars, max(0.0, at - state.last_event))
+                    state.last_event = max(state.last_event, at)
+                state.chars += chars
+                state.events += 1
+            self._evict(received)
+        return len(parsed)
+
+    def _add_gap(self, state: SessionState, chars: int, gap: float) -> None:
+        # Long pauses would swamp the typical gap, so they count as the threshold
+        capped = min(gap, self.pause_threshold)
+        if len(state.gaps) == state.gaps.maxlen:
+            state.gap_sum -= state.gaps[0]
+        state.gaps.append(capped)
+        state.gap_sum += capped
+        state.active_time += capped
+        if gap > 0:
+            # Events of one batch sent without timestamps arrive with no gap between them
+            rate = chars / max(gap, _MIN_GAP)
+            state.rate_ewma = rate if state.rate_ewma == 0 else self.alpha * rate + (1 - self.alpha) * state.rate_ewma
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock; the least recently active sessions are at the front
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.last_event <= self.session_ttl and len(self._sessions) <= self.max_sessions:
+                break
+            del self._sessions[session_id]
+            self.evicted += 1
+
+    def detect(self, session_id: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Writer's block status of a session from its rolling statistics.
+        
+        Args:
+            session_id (str): Editor session
+            now (float, optional): Current time in seconds since the epoch
+            
+        Returns:
+            Dict with `writer_block_detected`, the reason and the statistics behind it
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._sessions.get(session_id)
+            if state is None:
+                return {"writer_block_detected": False, "reason": "unknown_session", "events": 0}
+
+            idle = max(0.0, now - state.last_event)
+            typical_gap = state.gap_sum / len(state.gaps) if state.gaps else 0.0
+            pause_limit = max(self.pause_threshold, self.pause_factor * typical_gap)
+            average_rate = state.chars / state.active_time if state.active_time > 0 else 0.0
+
+            reason = None
+            if idle >= pause_limit:
+                reason = "pause"
+            elif (state.events >= self.min_events and average_rate > 0
+                  and state.rate_ewma < self.slowdown_ratio * average_rate):
+                reason = "slowdown"
+
+            return {
+                "writer_block_detected": reason is not None,
+                "reason": reason,
+                "idle_seconds": round(idle, 3),
+                "pause_limit_seconds": round(pause_limit, 3),
+                "typical_gap_seconds": round(typical_gap, 3),
+                "typing_rate": round(state.rate_ewma, 3),
+                "average_typing_rate": round(average_rate, 3),
+                "events": state.events
+            }
+
+    def end_session(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_stale(self, now: Optional[float] = None) -> int:
+        """Drop sessions idle for longer than the TTL, returning how many were dropped"""
+        with self._lock:
+            before = self.evicted
+            self._evict(time.time() if now is None else now)
+            return self.evicted - before
+
+    def stats(self) -> Dict[str, Any]:
+        """Session counters"""
+        with self._lock:
+            return {"sessions": len(self._sessions), "evicted": self.evicted}
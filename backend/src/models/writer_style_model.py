@@ -1,8 +1,148 @@
-from transformers import pipeline
+"""
+Writing style classification with a transformers sequence classifier.
+
+Texts are tokenized once and split into overlapping windows of at most
+`max_length` tokens, so long documents are classified in full instead of
+failing or being cut off. Windows from all texts are run together in
+length-sorted batches, and each text's label comes from the token-weighted
+mean of its windows' class probabilities. The model runs eagerly in PyTorch,
+with int8 dynamic quantisation, or on ONNX Runtime.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+from ..registry import get_classifier
+from ..settings import STYLE_MODEL, STYLE_MODEL_BACKEND, STYLE_MAX_LENGTH, STYLE_STRIDE, STYLE_BATCH_SIZE
+
+BACKENDS = ("pytorch", "int8", "onnx")
+
+
+def _load_model(model_name: str, backend: str) -> Tuple[Any, str]:
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            return ORTModelForSequenceClassification.from_pretrained(model_name, export=True), backend
+        except ImportError:
+            print("ONNX backend needs optimum[onnxruntime], falling back to PyTorch")
+            backend = "pytorch"
+
+    import torch
+    from transformers import AutoModelForSequenceClassification
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    if backend == "int8":
+        # Weights of the linear layers stored as int8, activations quantised on the fly
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model, backend
+
+
+class StyleClassifier:
+    """Batched, windowed text classifier; the shared instance is available as `get_classifier()`"""
+
+    def __init__(self, model: Any, tokenizer: Any, max_length: int = STYLE_MAX_LENGTH,
+                 stride: int = STYLE_STRIDE, batch_size: int = STYLE_BATCH_SIZE, backend: str = "pytorch"):
+        """
+        Args:
+            model: Sequence classification model (PyTorch, quantised or ONNX Runtime)
+            tokenizer: Matching fast tokenizer
+            max_length (int): Tokens per window, including special tokens
+            stride (int): Tokens shared by consecutive windows of a long text
+            batch_size (int): Windows per forward pass
+            backend (str): Name of the backend, for reporting
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_length = min(max_length, getattr(tokenizer, "model_max_length", max_length))
+        self.stride = min(stride, self.max_length // 2)
+        self.batch_size = batch_size
+        self.backend = backend
+        self.id2label = model.config.id2label
+
+    @classmethod
+    def load(cls, model_name: str = STYLE_MODEL, backend: str = STYLE_MODEL_BACKEND, **kwargs: Any) -> "StyleClassifier":
+        """
+        Load a model and its tokenizer for the given backend.
+        
+        Args:
+            model_name (str): Hugging Face model name or local path
+            backend (str): One of `BACKENDS`
+            **kwargs: Passed on to the constructor
+            
+        Returns:
+            StyleClassifier
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown style model backend: {backend}, expected one of {BACKENDS}")
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model, backend = _load_model(model_name, backend)
+        return cls(model, tokenizer, backend=backend, **kwargs)
+
+    def _windows(self, texts: List[str]) -> Dict[str, List[Any]]:
+        if self.tokenizer.is_fast:
+            encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length, stride=self.stride,
+                                     return_overflowing_tokens=True)
+            return {"input_ids": encoded["input_ids"], "owners": encoded["overflow_to_sample_mapping"]}
+        # Slow tokenizers cannot return overflowing windows, classify the first window only
+        encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        return {"input_ids": encoded["input_ids"], "owners": list(range(len(texts)))}
+
+    def classify(self, texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Classify texts of any length.
+        
+        Args:
+            texts (List[str]): Texts to classify
+            batch_size (int, optional): Windows per forward pass, defaults to the instance setting
+            
+        Returns:
+            {"label", "score"} for each text, in input order
+        """
+        if not texts:
+            return []
+        import torch
+
+        batch_size = batch_size or self.batch_size
+        windows = self._windows(list(texts))
+        input_ids, owners = windows["input_ids"], windows["owners"]
+
+        # Similar lengths together so little compute is spent on padding
+        order = sorted(range(len(input_ids)), key=lambda i: len(input_ids[i]))
+        totals = torch.zeros(len(texts), len(self.id2label))
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                inputs = self.tokenizer.pad({"input_ids": [input_ids[i] for i in batch]}, return_tensors="pt")
+                probabilities = torch.softmax(self.model(**inputs).logits.float(), dim=-1)
+                # Longer windows carry more of the text, so they weigh more
+                weights = inputs["attention_mask"].sum(dim=1, keepdim=True).float()
+                totals.index_add_(0, torch.tensor([owners[i] for i in batch]), probabilities * weights)
+
+        scores = totals / totals.sum(dim=1, keepdim=True)
+        best = scores.argmax(dim=1)
+        return [
+            {"label": self.id2label[int(label)], "score": float(scores[row, label])}
+            for row, label in enumerate(best)
+        ]
+
+    def __call__(self, inputs: Union[str, List[str]], batch_size: Optional[int] = None, **kwargs: Any) -> List[Dict[str, Any]]:
+        # Same output shape as a transformers text-classification pipeline
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        return self.classify(texts, batch_size)
 
-# Load an NLP model for sentiment & style analysis
-classifier = pipeline("text-classification", model="distilbert-base-uncased")
 
 def analyze_writing_style(text):
-    sentiment = classifier(text)[0]['label']  # e.g., "POSITIVE", "NEGATIVE", etc.
+    # The classifier is loaded on first use and shared across the process
+    sentiment = get_classifier().classify([text])[0]['label']  # e.g., "POSITIVE", "NEGATIVE", etc.
     return sentiment
+
+def analyze_writing_styles(texts: List[str], batch_size: Optional[int] = None) -> List[str]:
+    """
+    Batched `analyze_writing_style`: classify all texts in shared forward passes.
+    
+    Args:
+        texts (List[str]): Texts to classify
+        batch_size (int, optional): Windows per forward pass
+        
+    Returns:
+        Predicted label for each text, in input order
+    """
+    return [prediction['label'] for prediction in get_classifier().classify(list(texts), batch_size)]
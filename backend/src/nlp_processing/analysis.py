@@ -0,0 +1,167 @@
+from typing import Dict, Any, Iterable, List, Optional, Union, TYPE_CHECKING
+from collections import defaultdict
+from ..metrics import span
+from .partial import PartialAnalysis
+from .profiles import PipelineProfile, parse, profile_for_fields
+from .chunked import analyze_chunked, needs_chunking
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+
+# Bump whenever a change here alters analysis output, to invalidate derived caches
+ANALYSIS_VERSION = 2
+
+TRANSITION_WORDS = frozenset([
+    "however", "therefore", "furthermore", "moreover",
+    "consequently", "meanwhile", "nevertheless", "although"
+])
+
+
+class TextAnalysis:
+    """
+    Single-parse analysis of one input text.
+
+    The text is run through spaCy exactly once and every metric the backend
+    needs (statistics, style metrics, noun-chunk topics and structure) is
+    derived from that one Doc. Case-insensitive metrics lowercase at the
+    token level instead of parsing a lowercased copy of the text.
+
+    The Doc is parsed on first use. Statistics and style metrics of texts too
+    long for one Doc are computed chunk by chunk without building it.
+    """
+
+    def __init__(self, text: str, doc: Optional["Doc"] = None, profile: Union[str, PipelineProfile] = "full",
+                 fields: Optional[Iterable[str]] = None):
+        """
+        Args:
+            text (str): Input text to analyze
+            doc (Doc, optional): An already parsed Doc for `text`, e.g. from `nlp.pipe`
+            profile (str or PipelineProfile): Pipeline profile used to parse `text` when no
+                Doc is given; only the metrics that profile supports are meaningful
+            fields (Iterable[str], optional): Output fields of `statistics()` and `style()`
+                to compute, defaults to all; the profile is narrowed to what they need
+        """
+        self.text = text
+        self.fields = None if fields is None else frozenset(fields)
+        self.profile = profile if self.fields is None else profile_for_fields(self.fields, profile)
+        self._doc = doc
+        self._aggregates: Optional[PartialAnalysis] = None
+
+    @property
+    def doc(self) -> "Doc":
+        """The parsed text"""
+        if self._doc is None:
+            with span("spacy_parse"):
+                self._doc = parse(self.text, self.profile)
+        return self._doc
+
+    @property
+    def chunked(self) -> bool:
+        """Whether aggregates are computed chunk by chunk instead of from one Doc"""
+        return self._doc is None and needs_chunking(self.text)
+
+    @property
+    def aggregates(self) -> PartialAnalysis:
+        """Mergeable aggregates of the text, computed once and shared by statistics() and style()"""
+        if self._aggregates is None:
+            if self.chunked:
+                with span("chunked_analysis"):
+                    self._aggregates = analyze_chunked(self.text, profile=self.profile, fields=self.fields)
+            else:
+                doc = self.doc
+                with span("analysis_aggregates"):
+                    self._aggregates = PartialAnalysis.from_doc(doc, self.fields)
+        return self._aggregates
+
+    def statistics(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Text statistics in the format returned by `preprocess_text`.
+
+        Args:
+            fields (Iterable[str], optional): Keys to include, a subset of the fields
+                the analysis was created with; defaults to those fields
+
+        Returns:
+            Dict containing various text analysis metrics
+        """
+        return self.aggregates.statistics(self.fields if fields is None else fields)
+
+    def style(self) -> Dict[str, Any]:
+        """
+        Style metrics in the format returned by `analyze_writing_style`.
+
+        Returns:
+            Dict containing style metrics
+        """
+        return self.aggregates.style()
+
+    def noun_chunk_topics(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Rank noun chunks as candidate topics, favouring frequent and early chunks.
+
+        Args:
+            limit (int): Maximum number of topics to return
+
+        Returns:
+            List of topics with their score and the sentences they appear in
+        """
+        doc = self.doc
+
+        # Collect potential topics with their importance scores
+        topic_dict = defaultdict(lambda: {"score": 0, "context": set()})
+
+        for chunk in doc.noun_chunks:
+            if not chunk.root.is_stop and len(chunk.text.split()) <= 3:
+                position_score = 1 - (chunk.start / len(doc))
+                topic_dict[chunk.text.lower()]["score"] += (1 + position_score)
+                topic_dict[chunk.text.lower()]["context"].add(chunk.sent.text)
+
+        topics = [
+            {
+                "topic": topic,
+                "score": data["score"],
+                "context": list(data["context"])
+            }
+            for topic, data in topic_dict.items()
+        ]
+        topics.sort(key=lambda x: x["score"], reverse=True)
+        return topics[:limit]
+
+    def structure(self) -> Dict[str, Any]:
+        """
+        Structure and flow metrics in the format returned by `analyze_text_structure`.
+
+        Returns:
+            Dict containing paragraph, sentence type and transition metrics
+        """
+        # Analyze paragraphs
+        paragraphs = [p.strip() for p in self.text.split('\n\n') if p.strip()]
+
+        # Analyze sentence types
+        sentence_types = {
+            "statements": 0,
+            "questions": 0,
+            "complex": 0  # sentences with multiple clauses
+        }
+
+        transitions = 0
+
+        for sent in self.doc.sents:
+            # Count sentence types
+            if "?" in sent.text:
+                sentence_types["questions"] += 1
+            elif len([token for token in sent if token.dep_ == "mark"]) > 0:
+                sentence_types["complex"] += 1
+            else:
+                sentence_types["statements"] += 1
+
+            # Count transition words
+            if any(word.lower() in TRANSITION_WORDS for word in sent.text.split()):
+                transitions += 1
+
+        return {
+            "num_paragraphs": len(paragraphs),
+            "avg_paragraph_length": sum(len(p.split()) for p in paragraphs) / len(paragraphs) if paragraphs else 0,
+            "sentence_types": sentence_types,
+            "transitions": transitions
+        }
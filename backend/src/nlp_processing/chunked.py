@@ -0,0 +1,46 @@
+"""
+Chunked analysis for documents too long to parse in one piece.
+
+The text is split into chunks at paragraph (then sentence) boundaries and
+streamed through `nlp.pipe`; each chunk's Doc is reduced to a PartialAnalysis
+and discarded before later chunks are parsed, so peak memory depends on the
+chunk size rather than the document size. Merging the partials gives the
+same `preprocess_text` and `analyze_writing_style` output as a single parse
+whenever the chunk boundaries are sentence boundaries for the parser too,
+which holds for paragraph breaks.
+"""
+from typing import Iterable, Optional, Union
+from ..registry import get_nlp
+from ..settings import ANALYSIS_CHUNK_CHARS, ANALYSIS_CHUNK_THRESHOLD
+from .partial import PartialAnalysis, iter_chunks
+from .profiles import PipelineProfile, pipe
+
+
+def chunk_threshold() -> int:
+    """Text length above which analysis runs chunked, kept below spaCy's `nlp.max_length`"""
+    return min(ANALYSIS_CHUNK_THRESHOLD, int(get_nlp().max_length * 0.9))
+
+def needs_chunking(text: str) -> bool:
+    """Whether `text` is too long to be parsed as a single Doc"""
+    return len(text) > chunk_threshold()
+
+def analyze_chunked(text: str, chunk_chars: int = ANALYSIS_CHUNK_CHARS,
+                    profile: Union[str, PipelineProfile] = "full", batch_size: int = 4,
+                    fields: Optional[Iterable[str]] = None) -> PartialAnalysis:
+    """
+    Analyze text chunk by chunk, merging the partial results.
+    
+    Args:
+        text (str): Input text of any length
+        chunk_chars (int): Maximum characters per chunk
+        profile (str or PipelineProfile): Pipeline profile to parse chunks with
+        batch_size (int): Chunks spaCy parses per batch, bounding how many Docs are alive at once
+        fields (Iterable[str], optional): Output fields to collect aggregates for, defaults to all
+        
+    Returns:
+        PartialAnalysis of the whole text
+    """
+    partial = PartialAnalysis()
+    for doc in pipe(iter_chunks(text, chunk_chars), profile=profile, batch_size=batch_size):
+        partial.merge(PartialAnalysis.from_doc(doc, fields))
+    return partial
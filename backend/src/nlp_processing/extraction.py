@@ -0,0 +1,224 @@
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence, Tuple
+from ..metrics import timed
+from ..settings import EXTRACT_MAX_PAGES, EXTRACT_MAX_CHARS, PDF_PARALLEL_MIN_PAGES, PDF_WORKERS, UPLOAD_WORKERS
+
+# Pages handed to a PDF worker per task; small enough to stop soon after the character cap
+_PAGES_PER_TASK = 10
+
+# Forking the threaded server process, with LLM threads running and models loaded,
+# can deadlock the child, so workers are started from a clean interpreter instead
+_mp_context = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_upload_executor: Optional[ProcessPoolExecutor] = None
+# Guards creating and replacing the pools, which request threads do concurrently
+_executor_lock = threading.Lock()
+
+
+def _start_executor(max_workers: int) -> ProcessPoolExecutor:
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=_mp_context)
+    # Start the workers now rather than on the first upload
+    executor.submit(int)
+    return executor
+
+def start_extraction_pools() -> None:
+    """Create the upload and PDF process pools; call once at startup, before serving requests"""
+    global _pdf_executor, _upload_executor
+    with _executor_lock:
+        if _upload_executor is None:
+            _upload_executor = _start_executor(UPLOAD_WORKERS)
+        if _pdf_executor is None and PDF_WORKERS > 1:
+            _pdf_executor = _start_executor(PDF_WORKERS)
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    with _executor_lock:
+        if _pdf_executor is None:
+            _pdf_executor = _start_executor(PDF_WORKERS)
+        return _pdf_executor
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died, so the next caller gets a fresh one"""
+    global _pdf_executor, _upload_executor
+    with _executor_lock:
+        if _upload_executor is broken:
+            _upload_executor = None
+        if _pdf_executor is broken:
+            _pdf_executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def _extract_pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) from a PDF file (runs in worker processes)"""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def _extract_pdf_parallel(data: bytes, num_pages: int, max_chars: Optional[int]) -> List[str]:
+    # Workers read the document from a temporary file instead of each receiving a copy of it
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+
+        executor = _get_pdf_executor()
+        ranges = iter([(start, min(start + _PAGES_PER_TASK, num_pages))
+                       for start in range(0, num_pages, _PAGES_PER_TASK)])
+        in_flight = deque()
+
+        def schedule() -> None:
+            page_range = next(ranges, None)
+            if page_range is not None:
+                in_flight.append(executor.submit(_extract_pdf_pages, path, *page_range))
+
+        pages = []
+        total = 0
+        try:
+            for _ in range(PDF_WORKERS):
+                schedule()
+            while in_flight:
+                for page in in_flight.popleft().result():
+                    pages.append(page)
+                    total += len(page)
+                if max_chars and total >= max_chars:
+                    # Enough text; drop the ranges that are still queued
+                    for future in in_flight:
+                        future.cancel()
+                    break
+                schedule()
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            raise
+        return pages
+    finally:
+        os.remove(path)
+
+def _extract_pdf(data: bytes, max_pages: Optional[int], max_chars: Optional[int], parallel: bool) -> str:
+    from PyPDF2 import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    num_pages = len(reader.pages)
+    if max_pages:
+        num_pages = min(num_pages, max_pages)
+
+    if parallel and num_pages >= PDF_PARALLEL_MIN_PAGES and PDF_WORKERS > 1:
+        pages = _extract_pdf_parallel(data, num_pages, max_chars)
+    else:
+        pages = []
+        total = 0
+        for i in range(num_pages):
+            page = reader.pages[i].extract_text() or ""
+            pages.append(page)
+            total += len(page)
+            # Stop early once the character cap is reached
+            if max_chars and total >= max_chars:
+                break
+
+    return "".join(pages)
+
+def extract_text(data: bytes, filename: str, max_pages: Optional[int] = EXTRACT_MAX_PAGES,
+                 max_chars: Optional[int] = EXTRACT_MAX_CHARS, parallel: bool = True) -> str:
+    """
+    Extract text from an in-memory document.
+
+    Only large PDFs extracted in parallel are spilled to a temporary file, which
+    the page workers share.
+    
+    Args:
+        data (bytes): Raw file contents
+        filename (str): Original file name, used to pick the format
+        max_pages (int, optional): Maximum number of PDF pages to read, 0/None for no limit
+        max_chars (int, optional): Maximum number of characters to return, 0/None for no limit
+        parallel (bool): Allow extracting large PDFs on a process pool
+        
+    Returns:
+        str: Extracted text
+    """
+    ext = filename.rsplit('.', 1)[1].lower()
+
+    if ext == 'txt':
+        # TextIOWrapper gives the same universal newline handling as open()
+        text = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').read()
+
+    elif ext == 'pdf':
+        text = _extract_pdf(data, max_pages, max_chars, parallel)
+
+    elif ext in ['doc', 'docx']:
+        # Use python-docx for Word documents
+        from docx import Document
+        doc = Document(io.BytesIO(data))
+        text = '\n'.join([paragraph.text for paragraph in doc.paragraphs])
+
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+    if max_chars:
+        text = text[:max_chars]
+    return text
+
+def _get_upload_executor() -> ProcessPoolExecutor:
+    global _upload_executor
+    with _executor_lock:
+        if _upload_executor is None:
+            _upload_executor = _start_executor(UPLOAD_WORKERS)
+        return _upload_executor
+
+def _extract_upload(data: bytes, filename: str) -> str:
+    # Runs inside an upload worker, so PDF pages are not fanned out to yet another pool
+    return extract_text(data, filename, parallel=False)
+
+@timed("file_extraction")
+def extract_texts(uploads: Sequence[Tuple[str, bytes]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Extract text from several uploads in parallel on a bounded process pool.
+
+    A failing file does not affect the others.
+    
+    Args:
+        uploads (Sequence[Tuple[str, bytes]]): (filename, raw contents) pairs
+        
+    Returns:
+        List of (text, error) pairs in input order, exactly one of which is None
+    """
+    if not uploads:
+        return []
+    if len(uploads) == 1:
+        # Not worth a round trip through the pool
+        filename, data = uploads[0]
+        try:
+            return [(extract_text(data, filename), None)]
+        except Exception as e:
+            return [(None, str(e))]
+
+    futures: List[Future] = []
+    for attempt in range(2):
+        executor = _get_upload_executor()
+        try:
+            futures = [executor.submit(_extract_upload, data, filename) for filename, data in uploads]
+            break
+        except BrokenProcessPool as e:
+            # A worker died earlier; retry once on a fresh pool
+            _discard_executor(executor)
+            if attempt:
+                return [(None, f"Extraction workers unavailable: {e}")] * len(uploads)
+
+    results = []
+    broken = False
+    for future in futures:
+        try:
+            results.append((future.result(), None))
+        except BrokenProcessPool as e:
+            broken = True
+            results.append((None, f"Extraction worker crashed: {e}"))
+        except Exception as e:
+            results.append((None, str(e)))
+    if broken:
+        _discard_executor(executor)
+    return results
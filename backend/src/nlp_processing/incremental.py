@@ -0,0 +1,104 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any
+from .partial import PartialAnalysis, split_bounded
+from ..metrics import span
+from .profiles import pipe
+from ..settings import ANALYSIS_CHUNK_CHARS
+
+
+def _paragraph_key(paragraph: str) -> str:
+    return hashlib.blake2b(paragraph.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class IncrementalAnalyzer:
+    """
+    Paragraph-level incremental analysis for documents that are re-sent as they are edited.
+
+    Each paragraph's aggregates are cached by a hash of its content. Analysing
+    a new revision only parses paragraphs that are not in the cache and merges
+    the cached partials, so an edit costs about as much as the paragraphs it
+    touched. The cache is content-addressed and shared by all callers.
+    """
+
+    def __init__(self, max_paragraphs: int = 20000, profile: str = "full"):
+        """
+        Args:
+            max_paragraphs (int): Number of paragraph analyses kept in the LRU cache
+            profile (str): Pipeline profile used to parse paragraphs
+        """
+        self.max_paragraphs = max_paragraphs
+        self.profile = profile
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, PartialAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def analyze(self, text: str, batch_size: int = 32) -> PartialAnalysis:
+        """
+        Analyze a document revision, re-parsing only changed paragraphs.
+        
+        Args:
+            text (str): Full document text
+            batch_size (int): Number of changed paragraphs spaCy parses per batch
+            
+        Returns:
+            PartialAnalysis of the whole document; use `statistics()` and `style()`
+            for the `preprocess_text` and `analyze_writing_style` results
+        """
+        # Paragraphs too long for one Doc are cached as several sentence-aligned pieces
+        paragraphs = list(split_bounded(text, ANALYSIS_CHUNK_CHARS))
+        keys = [_paragraph_key(paragraph) for paragraph in paragraphs]
+
+        partials: Dict[str, PartialAnalysis] = {}
+        with self._lock:
+            for key in keys:
+                partial = self._cache.get(key)
+                if partial is not None:
+                    self._cache.move_to_end(key)
+                    partials[key] = partial
+            self.hits += sum(1 for key in keys if key in partials)
+
+        # Parse the missing paragraphs (each distinct one once) in a single batch
+        missing: Dict[str, str] = {}
+        for key, paragraph in zip(keys, paragraphs):
+            if key not in partials:
+                missing.setdefault(key, paragraph)
+        if missing:
+            with span("spacy_pipe"):
+                docs = pipe(missing.values(), profile=self.profile, batch_size=batch_size)
+                for key, doc in zip(list(missing), docs):
+                    partials[key] = PartialAnalysis.from_doc(doc)
+
+            with self._lock:
+                self.misses += len(missing)
+                for key in missing:
+                    self._cache[key] = partials[key]
+                while len(self._cache) > self.max_paragraphs:
+                    self._cache.popitem(last=False)
+
+        return PartialAnalysis.combine(partials[key] for key in keys)
+
+    def analyze_text(self, text: str) -> Dict[str, Any]:
+        """
+        Incremental equivalent of `preprocess_text` combined with `analyze_writing_style`.
+        
+        Args:
+            text (str): Full document text
+            
+        Returns:
+            Dict with the `preprocess_text` keys plus `style_metrics`
+        """
+        partial = self.analyze(text)
+        return {**partial.statistics(), **partial.style()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Paragraph cache counters"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "paragraphs": len(self._cache)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
@@ -0,0 +1,283 @@
+import re
+from collections import Counter
+from typing import Dict, Any, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+
+# A blank line (possibly containing whitespace) separates paragraphs; the whole
+# whitespace run around it is matched, as spaCy makes most of it a single token
+_PARAGRAPH_BREAK = re.compile(r'[^\S\n]*\n[^\S\n]*\n\s*')
+# Whitespace after sentence-final punctuation (and any closing quotes or brackets)
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])["\'\)\]\u201d\u2019]*\s+')
+_WHITESPACE = re.compile(r'\s+')
+
+# Output fields of `preprocess_text` and `analyze_writing_style`
+PREPROCESS_FIELDS = ("preprocessed_text", "statistics", "common_words", "named_entities")
+STYLE_FIELDS = ("style_metrics",)
+ALL_FIELDS = frozenset(PREPROCESS_FIELDS + STYLE_FIELDS)
+
+
+def parse_fields(fields: Union[None, str, Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """
+    Validate requested output fields.
+    
+    Args:
+        fields: None for every field, a comma-separated string or a list of field names
+        
+    Returns:
+        Set of field names, or None for every field
+    
+    Raises:
+        ValueError: For an unknown field name
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    requested = frozenset(field.strip() for field in fields if field.strip())
+    unknown = requested - ALL_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {sorted(unknown)}, expected some of {sorted(ALL_FIELDS)}")
+    return requested
+
+
+def _split_at(text: str, pattern: "re.Pattern") -> List[str]:
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        # Break where the separator's whitespace begins, so it leads the next piece. A
+        # single space is the previous token's trailing whitespace and stays with it,
+        # so both pieces tokenize exactly as the joined text does.
+        cut = match.start() + len(match.group().rstrip())
+        if text.startswith(" ", cut):
+            cut += 1
+        if cut > start:
+            pieces.append(text[start:cut])
+            start = cut
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+def split_paragraphs(text: str) -> List[str]:
+    """
+    Split text into paragraphs, attaching each separator to the paragraph after it.
+
+    Concatenating the result gives back the original text exactly. The blank
+    lines between paragraphs start the following paragraph: the rule-based
+    sentencizer puts whitespace after a sentence end into the next sentence,
+    and the parser keeps a leading whitespace token in the first sentence, so
+    chunks never gain a whitespace-only sentence at their end and sentences are
+    counted the same way as when the whole text is parsed at once.
+    
+    Args:
+        text (str): Input text
+        
+    Returns:
+        List of paragraphs
+    """
+    return _split_at(text, _PARAGRAPH_BREAK)
+
+def _pack(pieces: Iterable[str], max_chars: int) -> Iterator[str]:
+    # Greedily join consecutive pieces while the result stays within max_chars
+    buffer: List[str] = []
+    size = 0
+    for piece in pieces:
+        if buffer and size + len(piece) > max_chars:
+            yield "".join(buffer)
+            buffer, size = [], 0
+        buffer.append(piece)
+        size += len(piece)
+    if buffer:
+        yield "".join(buffer)
+
+def split_bounded(text: str, max_chars: int) -> Iterator[str]:
+    """
+    Split text into paragraphs, breaking paragraphs longer than `max_chars` at
+    sentence ends, and sentences longer than that at whitespace.
+
+    Like `split_paragraphs`, the pieces concatenate back to the original text
+    and the whitespace between two pieces starts the second one.
+    
+    Args:
+        text (str): Input text
+        max_chars (int): Preferred maximum piece length
+        
+    Yields:
+        Consecutive pieces of the text
+    """
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) <= max_chars:
+            yield paragraph
+            continue
+        for sentences in _pack(_split_at(paragraph, _SENTENCE_BREAK), max_chars):
+            if len(sentences) <= max_chars:
+                yield sentences
+            else:
+                yield from _pack(_split_at(sentences, _WHITESPACE), max_chars)
+
+def iter_chunks(text: str, max_chars: int) -> Iterator[str]:
+    """
+    Split text into chunks of at most about `max_chars`, preferring paragraph
+    and then sentence boundaries.
+    
+    Args:
+        text (str): Input text
+        max_chars (int): Maximum chunk length; only exceeded by a single
+            whitespace-free run longer than that
+        
+    Yields:
+        Consecutive chunks that concatenate back to `text`
+    """
+    yield from _pack(split_bounded(text, max_chars), max_chars)
+
+
+class PartialAnalysis:
+    """
+    Mergeable aggregates behind `preprocess_text` and `analyze_writing_style`.
+
+    A partial is built from the Doc of one piece of text (a paragraph, a chunk
+    or a whole document). Merging the partials of consecutive pieces, in order,
+    gives the same statistics and style metrics as analysing the joined text.
+    """
+
+    __slots__ = (
+        "word_count", "word_length_sum", "sentence_count", "sentence_lengths",
+        "lemmas", "lemma_counts", "entities", "pos_counts", "verb_tenses", "punctuation"
+    )
+
+    def __init__(self):
+        self.word_count = 0
+        self.word_length_sum = 0
+        self.sentence_count = 0
+        # Sentence length (in non-punctuation tokens) -> number of sentences
+        self.sentence_lengths: Counter = Counter()
+        self.lemmas: List[str] = []
+        self.lemma_counts: Counter = Counter()
+        self.entities: List[Tuple[str, str]] = []
+        self.pos_counts: Counter = Counter()
+        self.verb_tenses: Counter = Counter()
+        self.punctuation: Counter = Counter()
+
+    @classmethod
+    def from_doc(cls, doc: "Doc", fields: Optional[Iterable[str]] = None) -> "PartialAnalysis":
+        """
+        Collect the aggregates of a parsed Doc.
+        
+        Args:
+            doc (Doc): Parsed text
+            fields (Iterable[str], optional): Output fields to collect aggregates for,
+                defaults to all; the others are left empty
+            
+        Returns:
+            PartialAnalysis for the Doc
+        """
+        partial = cls()
+        fields = ALL_FIELDS if fields is None else fields
+        lemmas = "preprocessed_text" in fields or "common_words" in fields
+        stats = "statistics" in fields
+        style = "style_metrics" in fields
+
+        if lemmas or stats or style:
+            for token in doc:
+                if not token.is_punct:
+                    if stats:
+                        # Whitespace tokens count towards the length sum, as in the original metric
+                        partial.word_length_sum += len(token.text)
+                        if not token.is_space:
+                            partial.word_count += 1
+                elif style:
+                    partial.punctuation[token.text] += 1
+                if lemmas and not token.is_stop and token.is_alpha:
+                    partial.lemmas.append(token.lemma_.lower())
+                if stats:
+                    partial.pos_counts[token.pos_] += 1
+                if style and token.pos_ == "VERB":
+                    tense = token.morph.get("Tense")
+                    partial.verb_tenses[tense[0] if tense else "None"] += 1
+
+        if stats or style:
+            for sent in doc.sents:
+                partial.sentence_count += 1
+                if style:
+                    partial.sentence_lengths[sum(1 for token in sent if not token.is_punct)] += 1
+
+        partial.lemma_counts.update(partial.lemmas)
+        if "named_entities" in fields:
+            partial.entities = [(ent.text.lower(), ent.label_) for ent in doc.ents]
+        return partial
+
+    def merge(self, other: "PartialAnalysis") -> "PartialAnalysis":
+        """
+        Fold the partial of the following piece of text into this one, in place.
+        
+        Args:
+            other (PartialAnalysis): Partial of the text that comes after this one
+            
+        Returns:
+            self
+        """
+        self.word_count += other.word_count
+        self.word_length_sum += other.word_length_sum
+        self.sentence_count += other.sentence_count
+        self.sentence_lengths.update(other.sentence_lengths)
+        self.lemmas.extend(other.lemmas)
+        self.lemma_counts.update(other.lemma_counts)
+        self.entities.extend(other.entities)
+        self.pos_counts.update(other.pos_counts)
+        self.verb_tenses.update(other.verb_tenses)
+        self.punctuation.update(other.punctuation)
+        return self
+
+    @classmethod
+    def combine(cls, partials: Iterable["PartialAnalysis"]) -> "PartialAnalysis":
+        """Merge partials of consecutive pieces of text, in order, into a new partial"""
+        combined = cls()
+        for partial in partials:
+            combined.merge(partial)
+        return combined
+
+    def statistics(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Text statistics in the format returned by `preprocess_text`.
+
+        Args:
+            fields (Iterable[str], optional): Keys to include, defaults to all
+
+        Returns:
+            Dict containing various text analysis metrics
+        """
+        fields = ALL_FIELDS if fields is None else fields
+        result: Dict[str, Any] = {}
+        if "preprocessed_text" in fields:
+            result["preprocessed_text"] = " ".join(self.lemmas)
+        if "statistics" in fields:
+            avg_word_length = self.word_length_sum / self.word_count if self.word_count > 0 else 0
+            result["statistics"] = {
+                "word_count": self.word_count,
+                "sentence_count": self.sentence_count,
+                "avg_word_length": round(avg_word_length, 2),
+                "pos_distribution": dict(self.pos_counts)
+            }
+        if "common_words" in fields:
+            result["common_words"] = dict(self.lemma_counts.most_common(10))
+        if "named_entities" in fields:
+            result["named_entities"] = list(self.entities)
+        return result
+
+    def style(self) -> Dict[str, Any]:
+        """
+        Style metrics in the format returned by `analyze_writing_style`.
+
+        Returns:
+            Dict containing style metrics
+        """
+        total_length = sum(length * count for length, count in self.sentence_lengths.items())
+        avg_sentence_length = total_length / self.sentence_count if self.sentence_count else 0
+        return {
+            "style_metrics": {
+                "avg_sentence_length": round(avg_sentence_length, 2),
+                "verb_tenses": dict(self.verb_tenses),
+                "punctuation_usage": dict(self.punctuation)
+            }
+        }
@@ -1,103 +1,169 @@
-import spacy
-from typing import Dict, Any, List
-from collections import Counter
-from ..database.dataset_loader import BlogDatasetLoader
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+from collections import deque
+from itertools import islice
+import time
+from .analysis import TextAnalysis
+from ..metrics import observe
+from .profiles import pipe, profile_for_fields
+from .chunked import needs_chunking
 
 
-# Load the English language model
-nlp = spacy.load("en_core_web_sm")
-
-def preprocess_text(text: str) -> Dict[str, Any]:
+def preprocess_text(text: str, analysis: Optional[TextAnalysis] = None,
+                    fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
     """
     Preprocess and analyze text, extracting various linguistic features.
     
     Args:
         text (str): Input text to analyze
+        analysis (TextAnalysis, optional): Shared analysis of `text` to reuse instead of parsing again
+        fields (Iterable[str], optional): Keys to compute and return (see `PREPROCESS_FIELDS`),
+            defaults to all; only the spaCy components they need are run
         
     Returns:
         Dict containing various text analysis metrics
     """
-    # Process the text with spaCy
-    doc = nlp(text.lower())
-    
-    # Basic text statistics
-    word_count = len([token for token in doc if not token.is_punct and not token.is_space])
-    sentence_count = len(list(doc.sents))
-    avg_word_length = sum(len(token.text) for token in doc if not token.is_punct) / word_count if word_count > 0 else 0
-    
-    # Extract lemmatized tokens (excluding stopwords and punctuation)
-    tokens = [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
-    
-    # Get most common words
-    word_freq = Counter(tokens).most_common(10)
-    
-    # Named Entity Recognition
-    entities = [(ent.text, ent.label_) for ent in doc.ents]
-    
-    # Part of speech analysis
-    pos_counts = Counter([token.pos_ for token in doc])
-    
-    return {
-        "preprocessed_text": " ".join(tokens),
-        "statistics": {
-            "word_count": word_count,
-            "sentence_count": sentence_count,
-            "avg_word_length": round(avg_word_length, 2),
-            "pos_distribution": dict(pos_counts)
-        },
-        "common_words": dict(word_freq),
-        "named_entities": entities
-    }
-
-def analyze_writing_style(text: str) -> Dict[str, Any]:
+    if analysis is None:
+        analysis = TextAnalysis(text, fields=fields)
+    return analysis.statistics(fields)
+
+def analyze_writing_style(text: str, analysis: Optional[TextAnalysis] = None) -> Dict[str, Any]:
     """
     Analyze the writing style of the text.
     
     Args:
         text (str): Input text to analyze
+        analysis (TextAnalysis, optional): Shared analysis of `text` to reuse instead of parsing again
         
     Returns:
         Dict containing style metrics
     """
-    doc = nlp(text)
+    if analysis is None:
+        analysis = TextAnalysis(text, profile="style")
+    return analysis.style()
+
+def iter_text_analyses(texts: Iterable[str], batch_size: int = 32, n_process: int = 1,
+                       profile: str = "full", fields: Optional[Iterable[str]] = None) -> Iterator[TextAnalysis]:
+    """
+    Parse texts with spaCy's batched `nlp.pipe`, yielding a `TextAnalysis` per text in input order.
+
+    Texts too long for one Doc are not piped; their analyses are computed chunk
+    by chunk when first used.
     
-    # Calculate sentence complexity
-    sentence_lengths = [len([token for token in sent if not token.is_punct]) 
-                       for sent in doc.sents]
-    avg_sentence_length = sum(sentence_lengths) / len(sentence_lengths) if sentence_lengths else 0
+    Args:
+        texts (Iterable[str]): Texts to parse, may be a generator
+        batch_size (int): Number of texts spaCy parses per batch
+        n_process (int): Number of worker processes used by `nlp.pipe`
+        profile (str): Pipeline profile to parse with
+        fields (Iterable[str], optional): Output fields the analyses compute, defaults to all
+        
+    Yields:
+        TextAnalysis for each text
+    """
+    if fields is not None:
+        profile = profile_for_fields(fields, profile)
+
+    # Long texts go through the pipe as empty placeholders, in order
+    long_texts = deque()
+
+    def piped_texts() -> Iterator[str]:
+        for text in texts:
+            is_long = needs_chunking(text)
+            long_texts.append(text if is_long else None)
+            yield "" if is_long else text
+
+    docs = pipe(piped_texts(), profile=profile, batch_size=batch_size, n_process=n_process)
+    while True:
+        # Time only the parsing, not the work the consumer does between documents
+        start = time.perf_counter()
+        doc = next(docs, None)
+        if doc is None:
+            break
+        observe("spacy_pipe", time.perf_counter() - start)
+        long_text = long_texts.popleft()
+        if long_text is not None:
+            yield TextAnalysis(long_text, profile=profile, fields=fields)
+        else:
+            yield TextAnalysis(doc.text, doc, profile=profile, fields=fields)
+
+def preprocess_texts(texts: List[str], batch_size: int = 32,
+                     fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Batched `preprocess_text`: parse all texts with one `nlp.pipe` call.
     
-    # Analyze verb tenses
-    verb_tenses = Counter([token.morph.get("Tense")[0] if token.morph.get("Tense") else "None" 
-                          for token in doc if token.pos_ == "VERB"])
+    Args:
+        texts (List[str]): Texts to analyze
+        batch_size (int): Number of texts spaCy parses per batch
+        fields (Iterable[str], optional): Keys to compute and return, defaults to all
+        
+    Returns:
+        `preprocess_text` result for each text, in input order
+    """
+    analyses = iter_text_analyses(texts, batch_size=batch_size, fields=fields)
+    return [analysis.statistics() for analysis in analyses]
+
+def preprocess_requests(requests: List[Tuple[str, Optional[Tuple[str, ...]]]]) -> List[Dict[str, Any]]:
+    """
+    Batched `preprocess_text` for (text, fields) pairs with possibly different fields.
     
-    # Count different types of punctuation
-    punctuation = Counter([token.text for token in doc if token.is_punct])
+    Args:
+        requests (List[Tuple]): Text and requested fields (None for all) of each request
+        
+    Returns:
+        `preprocess_text` result for each request, in input order
+    """
+    # One nlp.pipe call per distinct set of fields
+    groups: Dict[Optional[frozenset], List[int]] = {}
+    for index, (_, fields) in enumerate(requests):
+        groups.setdefault(None if fields is None else frozenset(fields), []).append(index)
+
+    results: List[Dict[str, Any]] = [{} for _ in requests]
+    for fields, indices in groups.items():
+        for index, result in zip(indices, preprocess_texts([requests[i][0] for i in indices], fields=fields)):
+            results[index] = result
+    return results
+
+def iter_process_texts(texts: Iterable[str], max_texts: Optional[int] = None,
+                       batch_size: int = 32, n_process: int = 1,
+                       fields: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Process texts lazily with spaCy's batched `nlp.pipe`, yielding one result per text.
+
+    Results are yielded in input order as soon as their batch has been parsed,
+    so arbitrarily many texts can be processed without holding every result
+    in memory.
     
-    return {
-        "style_metrics": {
-            "avg_sentence_length": round(avg_sentence_length, 2),
-            "verb_tenses": dict(verb_tenses),
-            "punctuation_usage": dict(punctuation)
-        }
-    }
-
-def batch_process_texts(texts: List[str], max_texts: int = 1000) -> List[Dict[str, Any]]:
+    Args:
+        texts (Iterable[str]): Texts to process, may be a generator
+        max_texts (int, optional): Maximum number of texts to process
+        batch_size (int): Number of texts spaCy parses per batch
+        n_process (int): Number of worker processes used by `nlp.pipe`
+        fields (Iterable[str], optional): Statistics fields to compute, defaults to all;
+            components no field needs are not run
+        
+    Yields:
+        Combined `preprocess_text` and `analyze_writing_style` result for each text
+    """
+    if max_texts is not None:
+        texts = islice(texts, max_texts)
+    for analysis in iter_text_analyses(texts, batch_size=batch_size, n_process=n_process, fields=fields):
+        yield {**analysis.statistics(), **analysis.style()}
+
+def batch_process_texts(texts: Iterable[str], max_texts: int = 1000,
+                        batch_size: int = 32, n_process: int = 1) -> List[Dict[str, Any]]:
     """
     Process multiple texts in batch.
     
     Args:
-        texts (List[str]): List of texts to process
+        texts (Iterable[str]): Texts to process
         max_texts (int): Maximum number of texts to process
+        batch_size (int): Number of texts spaCy parses per batch
+        n_process (int): Number of worker processes used by `nlp.pipe`
         
     Returns:
         List of processed text analyses
     """
-    results = []
-    for text in texts[:max_texts]:
-        analysis = preprocess_text(text)
-        style = analyze_writing_style(text)
-        results.append({**analysis, **style})
-    return results
+    return list(iter_process_texts(texts, max_texts=max_texts,
+                                   batch_size=batch_size, n_process=n_process))
 
 if __name__ == "__main__":
     # Test the preprocessing functions
@@ -115,20 +181,21 @@ if __name__ == "__main__":
     print(f"Named entities: {analysis['named_entities']}")
     print(f"Style metrics: {style['style_metrics']}")
 
-# Load the dataset
-loader = BlogDatasetLoader()
-loader.load_dataset()
+    # Batch process a few samples from the blog corpus
+    from ..database.dataset_loader import BlogDatasetLoader
+    loader = BlogDatasetLoader()
+    loader.load_dataset()
 
-# Get some samples
-samples = loader.get_sample(n=5)
-texts = [sample['text'] for sample in samples]
+    # Get some samples
+    samples = loader.get_sample(n=5)
+    texts = [sample['text'] for sample in samples]
 
-# Process the texts
-analyses = batch_process_texts(texts)
+    # Process the texts
+    analyses = batch_process_texts(texts)
 
-# Now you have detailed analysis of each text
-for sample, analysis in zip(samples, analyses):
-    print(f"Author: {sample['gender']}, Age: {sample['age']}")
-    print(f"Text statistics: {analysis['statistics']}")
-    print(f"Writing style: {analysis['style_metrics']}")
-    print("---")
\ No newline at end of file
+    # Now you have detailed analysis of each text
+    for sample, analysis in zip(samples, analyses):
+        print(f"Author: {sample['gender']}, Age: {sample['age']}")
+        print(f"Text statistics: {analysis['statistics']}")
+        print(f"Writing style: {analysis['style_metrics']}")
+        print("---")
@@ -0,0 +1,119 @@
+"""
+Named spaCy pipeline profiles that run only the components a task needs.
+
+Components are skipped per call through the `disable` argument of `nlp(...)`
+and `nlp.pipe(...)`, so the shared pipeline is never mutated and profiles are
+safe to use from concurrent requests. Profiles without the parser can add
+sentence boundaries with spaCy's rule-based sentencizer instead.
+"""
+from typing import Dict, Iterable, Iterator, NamedTuple, Tuple, Union, TYPE_CHECKING
+from ..registry import get_nlp
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+
+# Components of en_core_web_sm
+ALL_COMPONENTS = ("tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner")
+
+
+class PipelineProfile(NamedTuple):
+    """Components to skip, and whether to add rule-based sentence boundaries afterwards"""
+    disable: Tuple[str, ...] = ()
+    sentencizer: bool = False
+
+
+PROFILES: Dict[str, PipelineProfile] = {
+    # Everything: statistics need lemmas, entities, POS and sentences
+    "full": PipelineProfile(),
+    # Sentences (parser), POS and morphology (tagger + attribute_ruler)
+    "style": PipelineProfile(disable=("lemmatizer", "ner")),
+    # Sentences and "mark" dependencies only
+    "structure": PipelineProfile(disable=("tagger", "attribute_ruler", "lemmatizer", "ner")),
+    # Noun chunks need the parse and coarse POS tags
+    "topics": PipelineProfile(disable=("lemmatizer", "ner")),
+    # Upload path: full statistics and style metrics, rule-based sentences instead of the parser
+    "fast": PipelineProfile(disable=("parser",), sentencizer=True),
+}
+
+# Components each output field of `preprocess_text` / `analyze_writing_style` depends on
+FIELD_COMPONENTS: Dict[str, Tuple[str, ...]] = {
+    "preprocessed_text": ("tok2vec", "tagger", "attribute_ruler", "lemmatizer"),
+    "common_words": ("tok2vec", "tagger", "attribute_ruler", "lemmatizer"),
+    # The NER model has its own embedding layer
+    "named_entities": ("ner",),
+    "statistics": ("tok2vec", "tagger", "attribute_ruler", "parser"),
+    "style_metrics": ("tok2vec", "tagger", "attribute_ruler", "parser"),
+}
+
+_sentencizer = None
+
+
+def _get_sentencizer():
+    global _sentencizer
+    if _sentencizer is None:
+        from spacy.pipeline import Sentencizer
+        _sentencizer = Sentencizer()
+    return _sentencizer
+
+def get_profile(profile: Union[str, PipelineProfile]) -> PipelineProfile:
+    """Look up a profile by name; profile instances are returned as they are"""
+    if isinstance(profile, PipelineProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown pipeline profile: {profile}, expected one of {sorted(PROFILES)}")
+
+def profile_for_fields(fields: Iterable[str], base: Union[str, PipelineProfile] = "full") -> PipelineProfile:
+    """
+    Narrow a profile to the components the requested output fields need.
+    
+    Args:
+        fields (Iterable[str]): Output fields, keys of `FIELD_COMPONENTS`
+        base (str or PipelineProfile): Profile whose disabled components stay disabled
+        
+    Returns:
+        PipelineProfile
+    """
+    base = get_profile(base)
+    needed = {component for field in fields for component in FIELD_COMPONENTS[field]}
+    disable = set(base.disable) | (set(ALL_COMPONENTS) - needed)
+    return PipelineProfile(disable=tuple(sorted(disable)), sentencizer=base.sentencizer)
+
+def parse(text: str, profile: Union[str, PipelineProfile] = "full") -> "Doc":
+    """
+    Parse one text running only the components of `profile`.
+    
+    Args:
+        text (str): Input text
+        profile (str or PipelineProfile): Pipeline profile or its name
+        
+    Returns:
+        Doc: Parsed text
+    """
+    selected = get_profile(profile)
+    doc = get_nlp()(text, disable=selected.disable)
+    return _get_sentencizer()(doc) if selected.sentencizer else doc
+
+def pipe(texts: Iterable[str], profile: Union[str, PipelineProfile] = "full", batch_size: int = 32,
+         n_process: int = 1) -> Iterator["Doc"]:
+    """
+    Parse texts with `nlp.pipe`, running only the components of `profile`.
+    
+    Args:
+        texts (Iterable[str]): Texts to parse
+        profile (str or PipelineProfile): Pipeline profile or its name
+        batch_size (int): Number of texts spaCy parses per batch
+        n_process (int): Number of worker processes used by `nlp.pipe`
+        
+    Yields:
+        Doc for each text, in input order
+    """
+    selected = get_profile(profile)
+    docs = get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process, disable=selected.disable)
+    if not selected.sentencizer:
+        yield from docs
+        return
+    sentencizer = _get_sentencizer()
+    for doc in docs:
+        yield sentencizer(doc)
@@ -0,0 +1,115 @@
+import json
+import os
+from typing import Dict, Any, List, Optional
+from .analysis import ANALYSIS_VERSION
+from .preprocess import batch_process_texts
+from ..database.dataset_loader import BlogDatasetLoader, DATASET_NAME
+from ..settings import CACHE_DIR
+from ..metrics import span
+
+# Bump when the shape of the cached style examples changes
+STYLE_EXAMPLES_VERSION = 1
+
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "style_examples.json")
+
+
+def _cache_key(dataset_name: str, split: str, n: int) -> Dict[str, Any]:
+    return {
+        "version": STYLE_EXAMPLES_VERSION,
+        "analysis_version": ANALYSIS_VERSION,
+        "dataset": dataset_name,
+        "split": split,
+        "n": n
+    }
+
+def build_style_examples(loader: BlogDatasetLoader, split: str = 'train', n: int = 5) -> List[Dict[str, Any]]:
+    """
+    Analyze n posts from the blog corpus to serve as writing style examples.
+    
+    Args:
+        loader (BlogDatasetLoader): Loader used to fetch the corpus
+        split (str): Dataset split ('train' or 'validation')
+        n (int): Number of examples
+        
+    Returns:
+        List of processed text analyses
+    """
+    if loader.dataset is None:
+        loader.load_dataset()
+    with span("dataset_sampling"):
+        samples = loader.get_sample(split=split, n=n)
+    with span("style_example_processing"):
+        return batch_process_texts([sample['text'] for sample in samples])
+
+def save_style_examples(examples: List[Dict[str, Any]], key: Dict[str, Any], cache_path: str = DEFAULT_CACHE_PATH) -> None:
+    """Atomically write style examples and their cache key to disk"""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"key": key, "examples": examples}, f)
+    os.replace(tmp_path, cache_path)
+
+def read_style_examples(split: str = 'train', n: int = 5,
+                        cache_path: str = DEFAULT_CACHE_PATH) -> Optional[List[Dict[str, Any]]]:
+    """
+    Read precomputed style examples without ever building them.
+
+    Args:
+        split (str): Dataset split ('train' or 'validation')
+        n (int): Number of examples
+        cache_path (str): Location of the on-disk cache
+
+    Returns:
+        List of processed text analyses, or None if the cache is missing, stale or unreadable
+    """
+    key = _cache_key(DATASET_NAME, split, n)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError) as e:
+        print(f"Ignoring unreadable style example cache: {e}")
+        return None
+    if cached.get("key") != key:
+        print("Ignoring stale style example cache")
+        return None
+    return cached.get("examples")
+
+def load_style_examples(loader: Optional[BlogDatasetLoader] = None, split: str = 'train', n: int = 5,
+                        cache_path: str = DEFAULT_CACHE_PATH) -> List[Dict[str, Any]]:
+    """
+    Load precomputed style examples, building and caching them if needed.
+
+    The cache is only reused when its key (format version, analysis version,
+    dataset, split and n) matches; otherwise the examples are rebuilt from the
+    corpus. Building loads and parses the corpus, so only the CLI below does it;
+    the server reads the cache with `read_style_examples`.
+    
+    Args:
+        loader (BlogDatasetLoader, optional): Loader to use if the cache must be rebuilt,
+            defaults to the shared registry dataset
+        split (str): Dataset split ('train' or 'validation')
+        n (int): Number of examples
+        cache_path (str): Location of the on-disk cache
+        
+    Returns:
+        List of processed text analyses
+    """
+    if loader is None or loader.dataset_name == DATASET_NAME:
+        examples = read_style_examples(split, n, cache_path)
+        if examples is not None:
+            return examples
+    print("Building style example cache")
+
+    if loader is None:
+        from ..registry import get_blog_dataset
+        loader = get_blog_dataset()
+    examples = build_style_examples(loader, split=split, n=n)
+    save_style_examples(examples, _cache_key(loader.dataset_name, split, n), cache_path)
+    return examples
+
+if __name__ == "__main__":
+    # Build the cache ahead of time, e.g. during deployment
+    examples = load_style_examples()
+    print(f"Cached {len(examples)} style examples at {DEFAULT_CACHE_PATH}")
@@ -0,0 +1,171 @@
+"""
+Lazily initialised, process-wide registry of expensive shared resources.
+
+Models, clients and datasets are created on first use and then shared by every
+caller in the process, so importing the backend stays cheap and each model is
+loaded at most once per process. Call `warm_up` to load them ahead of time.
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+_instances: Dict[str, Any] = {}
+_lock = threading.RLock()
+
+
+def _load_nlp() -> Any:
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+def _load_classifier() -> Any:
+    from .models.writer_style_model import StyleClassifier
+    # NLP model for sentiment & style analysis, backend chosen by STYLE_MODEL_BACKEND
+    return StyleClassifier.load()
+
+def _load_llm_client() -> Any:
+    from .models.llm_cache import CachedChatClient
+    from .settings import LLM_CACHE_ENABLED, LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_PATH, USE_FAKE_LLM
+
+    if USE_FAKE_LLM:
+        from .models.fake_openai import FakeChatClient
+        base_client = FakeChatClient()
+    else:
+        from openai import OpenAI
+        api_key = os.getenv('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        base_client = OpenAI(api_key=api_key)
+
+    # Wrap the client in the response cache
+    return CachedChatClient(
+        base_client,
+        max_entries=LLM_CACHE_SIZE,
+        ttl=LLM_CACHE_TTL,
+        db_path=LLM_CACHE_PATH or None,
+        enabled=LLM_CACHE_ENABLED
+    )
+
+def _load_blog_dataset() -> Any:
+    from .database.dataset_loader import BlogDatasetLoader
+    loader = BlogDatasetLoader()
+    loader.load_dataset()
+    return loader
+
+def _load_style_examples() -> Any:
+    from .nlp_processing.style_examples import read_style_examples
+    # Never built here, as that loads and parses the corpus; run the style_examples CLI instead
+    examples = read_style_examples()
+    if examples is None:
+        print("No style example cache, continuing without examples "
+              "(build it with `python -m src.nlp_processing.style_examples`)")
+        return []
+    return examples
+
+def _load_style_index() -> Any:
+    from .models.style_index import StyleIndex
+    # None until the index has been built offline
+    return StyleIndex.load()
+
+def _load_result_store() -> Any:
+    from .settings import DATABASE_URL
+    if not DATABASE_URL:
+        return None
+    from .database.result_store import ResultStore
+    return ResultStore(DATABASE_URL)
+
+def _load_style_profiles() -> Any:
+    from .settings import DATABASE_URL
+    if not DATABASE_URL:
+        return None
+    from .database.style_profile_store import StyleProfileStore
+    return StyleProfileStore(DATABASE_URL)
+
+_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "nlp": _load_nlp,
+    "classifier": _load_classifier,
+    "llm_client": _load_llm_client,
+    "blog_dataset": _load_blog_dataset,
+    "style_examples": _load_style_examples,
+    "style_index": _load_style_index,
+    "result_store": _load_result_store,
+    "style_profiles": _load_style_profiles,
+}
+
+def get(name: str) -> Any:
+    """
+    Return the shared instance registered under `name`, creating it on first use.
+
+    Args:
+        name (str): Registry entry, one of the keys of `_FACTORIES`
+
+    Returns:
+        The shared instance
+    """
+    # Membership rather than None checks, so factories may legitimately return None
+    if name not in _instances:
+        with _lock:
+            if name not in _instances:
+                _instances[name] = _FACTORIES[name]()
+    return _instances[name]
+
+def get_nlp() -> Any:
+    """Shared spaCy `en_core_web_sm` pipeline"""
+    return get("nlp")
+
+def get_classifier() -> Any:
+    """Shared windowed `StyleClassifier`, on the pytorch, int8 or ONNX backend chosen by STYLE_MODEL_BACKEND"""
+    return get("classifier")
+
+def get_llm_client() -> Any:
+    """Shared, cached OpenAI chat client"""
+    return get("llm_client")
+
+def get_blog_dataset() -> Any:
+    """Shared `BlogDatasetLoader` with the corpus loaded"""
+    return get("blog_dataset")
+
+def get_style_examples() -> Any:
+    """Shared precomputed style example analyses"""
+    return get("style_examples")
+
+def get_style_index() -> Any:
+    """Shared style-similarity index, or None if it has not been built"""
+    return get("style_index")
+
+def get_result_store() -> Any:
+    """Shared analysis result store, or None if DATABASE_URL is empty"""
+    return get("result_store")
+
+def get_style_profiles() -> Any:
+    """Shared per-user style profile store, or None if DATABASE_URL is empty"""
+    return get("style_profiles")
+
+def override(name: str, instance: Any) -> None:
+    """
+    Replace a registry entry, e.g. with a fake client in benchmarks or offline runs.
+
+    Args:
+        name (str): Registry entry, one of the keys of `_FACTORIES`
+        instance: Object to return for the entry from now on
+    """
+    if name not in _FACTORIES:
+        raise KeyError(f"Unknown registry entry: {name}")
+    with _lock:
+        _instances[name] = instance
+
+def is_loaded(name: str) -> bool:
+    """Whether the entry has already been created in this process"""
+    return name in _instances
+
+def warm_up(names: Optional[Iterable[str]] = None) -> None:
+    """
+    Eagerly create registry entries, e.g. at worker startup.
+
+    Args:
+        names (Iterable[str], optional): Entries to load, defaults to all of them
+    """
+    for name in (names if names is not None else _FACTORIES):
+        if name not in _FACTORIES:
+            print(f"Unknown registry entry for warm-up: {name}")
+            continue
+        get(name)
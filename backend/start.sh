@@ -1,8 +1,15 @@
 #!/bin/bash
 
+cd "$(dirname "$0")" # Make sure we're in the right directory
+
+# Cache the tokenizer encoding so prompt token counts never download at request time
+python -m src.models.prompt_builder || echo "Continuing with approximate prompt token counts"
+
+# Build the style example cache if it is missing or stale; the server only reads it
+python -m src.nlp_processing.style_examples || echo "Continuing without style examples"
+
 # Start the Flask server in the background
 echo "Starting Flask server..."
-cd "$(dirname "$0")" # Make sure we're in the right directory
 python -m src.app &
 FLASK_PID=$!
 
@@ -0,0 +1,67 @@
+"""Chunked analysis must match a single parse of the whole text under every pipeline profile."""
+import pytest
+
+spacy = pytest.importorskip("spacy")
+
+from spacy.language import Language
+from spacy.pipeline import Sentencizer
+
+from src import registry
+from src.nlp_processing.chunked import analyze_chunked
+from src.nlp_processing.partial import PartialAnalysis, iter_chunks
+from src.nlp_processing.profiles import PROFILES, parse
+
+PARAGRAPHS = [
+    "The committee met on Tuesday. It reviewed the budget, the hiring plan and the roadmap!",
+    "Was the plan approved? \"Not yet,\" said the chair. Another vote is scheduled for May.",
+    "Short one.",
+    " ".join(f"Sentence number {i} of a long paragraph keeps going for a while." for i in range(12)),
+    "Lines can break\ninside a paragraph. And continue here.\nEven twice.",
+]
+SEPARATORS = ["\n\n", "\n \n  ", "\n\n\n", "  \n\n"]
+
+
+@Language.component("parser_stub")
+def parser_stub(doc):
+    # Rule-based sentences with whitespace attached to the preceding sentence, as the parser does
+    doc = Sentencizer()(doc)
+    for token in doc[1:]:
+        if token.is_space and token.is_sent_start:
+            token.is_sent_start = False
+            if token.i + 1 < len(doc):
+                doc[token.i + 1].is_sent_start = True
+    return doc
+
+
+@pytest.fixture(scope="module", autouse=True)
+def nlp():
+    try:
+        nlp = spacy.load("en_core_web_sm")
+    except OSError:
+        # Without the model, stand in a pipeline whose "parser" sets sentence boundaries
+        nlp = spacy.blank("en")
+        nlp.add_pipe("parser_stub", name="parser")
+    registry.override("nlp", nlp)
+    return nlp
+
+
+def _text():
+    text = ""
+    for i, paragraph in enumerate(PARAGRAPHS * 3):
+        text += paragraph + SEPARATORS[i % len(SEPARATORS)]
+    return text
+
+
+def test_chunks_rejoin_to_text():
+    text = _text()
+    assert "".join(iter_chunks(text, 120)) == text
+
+
+@pytest.mark.parametrize("profile", sorted(PROFILES))
+def test_chunked_matches_single_parse(profile):
+    text = _text()
+    single = PartialAnalysis.from_doc(parse(text, profile))
+    chunked = analyze_chunked(text, chunk_chars=120, profile=profile)
+
+    assert chunked.statistics() == single.statistics()
+    assert chunked.style() == single.style()